@@ -2,6 +2,8 @@
 OFFLINE Wordle Benchmark - Ollama (20 games)
 """
 
+import asyncio
+import random
 import time
 import json
 from pathlib import Path
@@ -13,83 +15,138 @@ except ImportError:
     HAS_WANDB = False
     print("wandb not installed - running without logging")
 
-from classes.GameState import GameState, Status
-from constants import LLM_MODEL, MAX_LLM_CONTINUOUS_CALLS
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from classes.GameState import (GameState, Status, BatchedSolver, WORDS_TUPLE, load_llm_cache,
+                               save_llm_cache, warm_up_solver)
+from constants import LLM_MODEL, MAX_LLM_CONTINUOUS_CALLS, LLM_BATCH_SIZE
 
 LOG_DIR = Path("benchmarks/logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
+LLM_CACHE_FILE = LOG_DIR / "llm_cache.json"
+RESULTS_FILE = LOG_DIR / "offline_wordle_results.jsonl"
+SUMMARY_FILE = LOG_DIR / "offline_wordle_summary.json"
 
 NUM_RUNS = 20  # 20 games for offline/local models
+SEED = None  # set to an int to replay the same target words
 
 
-def run_game(game, run_id):
-    print(f"\n{'='*40}")
-    print(f"Starting run {run_id + 1}")
-    print(f"{'='*40}")
-    
-    game.reset()
-    game_start = time.time()
-    llm_calls = 0
-    good = 0
-    bad = 0
-    
-    while game.status != Status.end:
-        calls = game.enter_word_from_ai()
-        llm_calls += calls
-        if game.was_valid_guess:
-            good += 1
-            bad += max(0, calls - 1)
-        else:
-            bad += 1
-    
-    game_time = time.time() - game_start
-    
+def write_json(path, data):
+    """Write data as indented JSON, using orjson when it is installed"""
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def json_line(data) -> str:
+    """Serialize data as one JSONL line"""
+    return (orjson.dumps(data).decode() if HAS_ORJSON else json.dumps(data)) + "\n"
+
+
+def game_result(game, run_id, stats, latency_ns):
     print(f"\n--- Run {run_id + 1} Results ---")
     print(f"Success: {'✅ YES' if game.success else '❌ NO'}")
     print(f"Tries: {game.num_of_tries()}")
     print(f"Target was: {game.target_word}")
-    print(f"Game latency: {game_time:.2f}s")
+    print(f"Game latency: {latency_ns / 1e9:.2f}s")
     
     return {
+        'run_id': run_id + 1,
         'success': game.success,
         'tries': game.num_of_tries(),
         'target': game.target_word,
-        'latency': game_time,
-        'llm_calls': llm_calls,
-        'good': good,
-        'bad': bad
+        'latency_ns': latency_ns,
+        'llm_calls': game.llm_requests,
+        'llm_cache_hits': game.llm_cache_hits,
+        'llm_shared_replies': game.llm_shared_replies,
+        'good': stats['good'],
+        'bad': stats['bad']
     }
 
 
+async def run_all(games, results_file):
+    """
+    Play all games in lockstep: every active game makes one guess per turn,
+    so a turn's LLM requests reach the BatchedSolver together.
+    Each finished game is appended to results_file as one JSON line.
+    """
+    solver = BatchedSolver(max_batch_size=LLM_BATCH_SIZE)
+    results = [None] * len(games)
+    stats = [{'good': 0, 'bad': 0} for _ in games]
+    active = list(range(len(games)))
+    game_start = time.perf_counter_ns()
+    turn = 0
+    
+    while active:
+        turn += 1
+        print(f"\n--- Turn {turn}: {len(active)} active games ---")
+        
+        calls = await asyncio.gather(*(games[i].enter_word_from_ai_async(solver.request)
+                                       for i in active))
+        
+        for i, c in zip(active, calls):
+            game, s = games[i], stats[i]
+            if game.was_valid_guess:
+                s['good'] += 1
+                s['bad'] += max(0, c - 1)
+            else:
+                s['bad'] += 1
+            
+            if game.status == Status.end:
+                results[i] = game_result(game, i, s, time.perf_counter_ns() - game_start)
+                results_file.write(json_line(results[i]))
+                results_file.flush()
+        
+        active = [i for i in active if games[i].status != Status.end]
+    
+    return results
+
+
 def main():
     print(f"\n{'#'*50}")
     print(f"# OFFLINE WORDLE BENCHMARK (Ollama)")
     print(f"# Model: {LLM_MODEL}")
     print(f"# Games: {NUM_RUNS}")
+    print(f"# Batch size: {LLM_BATCH_SIZE}")
     print(f"{'#'*50}")
     
+    print(f"Loaded {load_llm_cache(LLM_CACHE_FILE)} cached LLM responses")
+    
     if HAS_WANDB:
         wandb.init(project="llm-wordle-comp", name=f"offline-{LLM_MODEL}")
     
-    game = GameState(show_window=False, logging=True)
+    warm_up_solver()
+    targets = random.Random(SEED).sample(WORDS_TUPLE, NUM_RUNS)
+    games = [GameState(show_window=False, logging=True, target=t) for t in targets]
+    
+    wall_start = time.perf_counter_ns()
+    with open(RESULTS_FILE, 'w') as results_file:
+        results = asyncio.run(run_all(games, results_file))
+    wall_time_ns = time.perf_counter_ns() - wall_start
     
-    results = []
     total_wins = 0
     total_tries = 0
-    total_latency = 0
+    total_latency_ns = 0
     total_llm = 0
+    total_cache_hits = 0
+    total_shared = 0
     total_good = 0
     total_bad = 0
     
-    for i in range(NUM_RUNS):
-        r = run_game(game, i)
-        results.append(r)
-        
+    for i, r in enumerate(results):
         if r['success']:
             total_wins += 1
         total_tries += r['tries']
-        total_latency += r['latency']
+        total_latency_ns += r['latency_ns']
         total_llm += r['llm_calls']
+        total_cache_hits += r['llm_cache_hits']
+        total_shared += r['llm_shared_replies']
         total_good += r['good']
         total_bad += r['bad']
         
@@ -100,7 +157,8 @@ def main():
     
     win_rate = total_wins / NUM_RUNS
     avg_tries = total_tries / NUM_RUNS
-    avg_latency = total_latency / NUM_RUNS
+    avg_latency = total_latency_ns / NUM_RUNS / 1e9
+    wall_time = wall_time_ns / 1e9
     ratio = total_good / total_bad if total_bad > 0 else float('inf')
     
     print(f"\n{'='*50}")
@@ -112,6 +170,10 @@ def main():
     print(f"  Win Rate:        {win_rate:.1%} ({total_wins}/{NUM_RUNS})")
     print(f"  Average Tries:   {avg_tries:.2f}")
     print(f"  Average Latency: {avg_latency:.2f}s")
+    print(f"  Wall Time:       {wall_time:.2f}s")
+    print(f"  Total LLM Calls: {total_llm}")
+    print(f"  LLM Cache Hits:  {total_cache_hits}")
+    print(f"  Shared Replies:  {total_shared}")
     print(f"  Good/Bad Ratio:  {ratio:.2f}" if total_bad > 0 else "  Good/Bad Ratio:  ∞")
     print(f"{'='*50}")
     
@@ -122,16 +184,27 @@ def main():
         'win_rate': win_rate,
         'avg_tries': avg_tries,
         'avg_latency': avg_latency,
-        'games': results
+        'wall_time': wall_time,
+        'total_llm_calls': total_llm,
+        'total_llm_cache_hits': total_cache_hits,
+        'total_llm_shared_replies': total_shared,
+        'games_file': str(RESULTS_FILE)
     }
     
-    log_file = LOG_DIR / "offline_wordle_results.json"
-    with open(log_file, 'w') as f:
-        json.dump(output, f, indent=2)
-    print(f"\nResults saved to: {log_file}")
+    write_json(SUMMARY_FILE, output)
+    print(f"\nGame results saved to: {RESULTS_FILE}")
+    print(f"Summary saved to: {SUMMARY_FILE}")
+    
+    save_llm_cache(LLM_CACHE_FILE)
     
     if HAS_WANDB:
-        wandb.log({"win_rate": win_rate, "avg_tries": avg_tries})
+        columns = list(results[0])
+        wandb.log({
+            "games_table": wandb.Table(columns=columns,
+                                       data=[[r[c] for c in columns] for r in results]),
+            "win_rate": win_rate,
+            "avg_tries": avg_tries,
+        })
         wandb.finish()
 
 
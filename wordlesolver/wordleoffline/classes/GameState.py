@@ -2,545 +2,924 @@
 GameState - Complete Wordle/Fibble game with integrated AI solver
 """
 
+import asyncio
+import hashlib
+import heapq
+import http.client
+import json
+import math
 import random
 import re
-from typing import List, Optional, Dict, Set, Tuple
+import ssl
+import threading
+import time
+import urllib.parse
+from typing import Callable, List, Optional, Dict, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+from pathlib import Path
 
 from classes.LetterCell import LetterCell, Feedback
+import constants
 from constants import LLM_MODEL, MAX_LLM_CONTINUOUS_CALLS
 
+# Platform settings, resolved once; each constants.py only defines the ones it uses
+LLM_PLATFORM = getattr(constants, "LLM_PLATFORM", "groq")
+OLLAMA_HOST = getattr(constants, "OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = getattr(constants, "OLLAMA_KEEP_ALIVE", "30m")
+GEMINI_API_KEY = getattr(constants, "GEMINI_API_KEY", None)
+OPENROUTER_API_KEY = getattr(constants, "OPENROUTER_API_KEY", None)
+GROQ_API_KEY = getattr(constants, "GROQ_API_KEY", None)
+
+# certifi's CA bundle, when installed, for Pythons without system certificates (e.g. macOS)
+try:
+    import certifi
+    HAS_CERTIFI = True
+except ImportError:
+    HAS_CERTIFI = False
+
 
 class Status(Enum):
     playing = "playing"
     end = "end"
 
 
+# =============================================================================
+# FEEDBACK KERNEL - a guess's feedback packed into one byte
+# =============================================================================
+
+# One base-3 digit (the Feedback value) per position, position i weighted
+# by 3**i, so every pattern fits in 0-242
+_PATTERN_FEEDBACK = tuple(
+    tuple(Feedback(code // 3 ** i % 3) for i in range(5)) for code in range(3 ** 5)
+)
+# The same digits as plain ints, for the solver's hot paths
+_PATTERN_DIGITS = tuple(tuple(int(fb) for fb in feedback) for feedback in _PATTERN_FEEDBACK)
+# Display strings per pattern, and the prompt label per Feedback value
+_PATTERN_EMOJI = tuple(''.join('⬛🟨🟩'[d] for d in digits) for digits in _PATTERN_DIGITS)
+_FEEDBACK_LABELS = ("GRAY", "YELLOW", "GREEN")
+
+# Fixed pieces of the LLM prompt
+_PROMPT_HEADER = "You are playing Wordle. Guess a 5-letter word.\n"
+_FIBBLE_NOTE = ("\nIMPORTANT: There are {} lies in feedback. "
+                "Lies are ALWAYS in the SAME column for all guesses.\n")
+_PROMPT_FOOTER = "Reply with ONLY a 5-letter word:"
+
+
+@lru_cache(maxsize=4096)
+def _history_line(letters: bytes, pattern: int) -> str:
+    """Prompt line for one past guess, e.g. '  SALET -> S:GRAY, A:YELLOW, ...'"""
+    word = bytes(k + 65 for k in letters).decode()  # uppercase
+    fb_str = ', '.join(f"{letter}:{_FEEDBACK_LABELS[d]}"
+                       for letter, d in zip(word, _PATTERN_DIGITS[pattern]))
+    return f"  {word} -> {fb_str}\n"
+
+
+def _feedback_code(guess: str, target: str) -> int:
+    """Wordle feedback for guess vs target as a packed pattern (0-242)"""
+    # Scores each entered guess against the target (_calculate_feedback);
+    # the solver's feedback rows come from the bitsets in _digit_masks
+    g0, g1, g2, g3, g4 = guess
+    t0, t1, t2, t3, t4 = target
+    
+    # Greens; target letters not matched in place are kept in `remaining`,
+    # which the yellows use up left to right
+    code = 0
+    remaining = ''
+    if g0 == t0:
+        code += 2
+    else:
+        remaining += t0
+    if g1 == t1:
+        code += 6
+    else:
+        remaining += t1
+    if g2 == t2:
+        code += 18
+    else:
+        remaining += t2
+    if g3 == t3:
+        code += 54
+    else:
+        remaining += t3
+    if g4 == t4:
+        code += 162
+    else:
+        remaining += t4
+    if not remaining:
+        return code
+    
+    # Yellows
+    if g0 != t0 and g0 in remaining:
+        code += 1
+        remaining = remaining.replace(g0, '', 1)
+    if g1 != t1 and g1 in remaining:
+        code += 3
+        remaining = remaining.replace(g1, '', 1)
+    if g2 != t2 and g2 in remaining:
+        code += 9
+        remaining = remaining.replace(g2, '', 1)
+    if g3 != t3 and g3 in remaining:
+        code += 27
+        remaining = remaining.replace(g3, '', 1)
+    if g4 != t4 and g4 in remaining:
+        code += 81
+    return code
+
+
+def _encode_feedback(feedback: List[Feedback]) -> int:
+    """Pack a list of Feedback into a pattern"""
+    return sum(fb * 3 ** i for i, fb in enumerate(feedback))
+
+
+def _decode_feedback(code: int) -> List[Feedback]:
+    """Unpack a pattern into a list of Feedback"""
+    return list(_PATTERN_FEEDBACK[code])
+
+
 class Word:
     """Represents a single guess with its letters and feedback"""
     def __init__(self):
-        self.cells: List[LetterCell] = [LetterCell() for _ in range(5)]
         self.word: str = ""
+        self.letters: bytes = bytes(5)  # letter indices 0-25
+        self.pattern: int = 0           # packed feedback, see _feedback_code
     
     def set_word(self, word: str):
         self.word = word.lower()
-        for i, letter in enumerate(word[:5]):
-            self.cells[i].set_letter(letter)
+        self.letters = bytes(ord(c) - ord('a') for c in self.word[:5])
+    
+    def set_pattern(self, pattern: int):
+        self.pattern = pattern
     
     def set_feedback(self, feedback: List[Feedback]):
-        for i, fb in enumerate(feedback):
-            self.cells[i].set_feedback(fb)
+        self.pattern = _encode_feedback(feedback)
     
     def get_feedback(self) -> List[Feedback]:
-        return [cell.feedback for cell in self.cells]
+        return _decode_feedback(self.pattern)
+    
+    @property
+    def cells(self) -> List[LetterCell]:
+        """Per-letter view of the word, built on demand for display code"""
+        cells = [LetterCell() for _ in range(5)]
+        for cell, letter, fb in zip(cells, self.word, _PATTERN_FEEDBACK[self.pattern]):
+            cell.set_letter(letter)
+            cell.set_feedback(fb)
+        return cells
 
 
 # =============================================================================
 # AI SOLVER - Integrated directly into this file
 # =============================================================================
 
+# Column indices to apply an absent letter to, excluding the given lie column (-1: none)
+_COLUMNS_EXCEPT = {col: tuple(j for j in range(5) if j != col) for col in range(-1, 5)}
+
+
 @dataclass
 class Constraints:
     """Tracks all known constraints from guesses"""
-    correct_pos: Dict[int, str] = field(default_factory=dict)
-    excluded_pos: Dict[int, Set[str]] = field(default_factory=lambda: {i: set() for i in range(5)})
-    min_count: Dict[str, int] = field(default_factory=dict)
-    max_count: Dict[str, int] = field(default_factory=dict)
+    correct_pos: List[int] = field(default_factory=lambda: [-1] * 5)  # letter index 0-25, -1 if unknown
+    excluded_pos: List[int] = field(default_factory=lambda: [0] * 5)  # 26-bit masks of excluded letters
+    min_count: List[int] = field(default_factory=lambda: [0] * 26)  # per letter index
+    max_count: List[int] = field(default_factory=lambda: [_NO_MAX] * 26)
+    _compiled: Optional[tuple] = field(default=None, repr=False, compare=False)
+    # 26-bit masks kept up to date by update(): letters with min count >= 1,
+    # and letters with max count 0
+    _required_letters: int = field(default=0, repr=False, compare=False)
+    _forbidden_letters: int = field(default=0, repr=False, compare=False)
     
-    def update(self, word: str, feedback: List[Feedback], ignore_column: int = -1):
-        """Update constraints from a guess. For Fibble, ignore_column skips a lying column."""
-        word = word.lower()
+    def update(self, letters: bytes, pattern: int, ignore_column: int = -1):
+        """
+        Update constraints from a guess, given as letter indices 0-25 (Word.letters)
+        and its packed feedback pattern. For Fibble, ignore_column skips a lying column.
+        """
+        feedback = _PATTERN_DIGITS[pattern]
         confirmed = {}
+        self._compiled = None
+        excluded_pos = self.excluded_pos
+        # Don't add exclusions based on lie column
+        columns = _COLUMNS_EXCEPT[ignore_column]
         
-        for i, (letter, fb) in enumerate(zip(word, feedback)):
+        for i, (k, fb) in enumerate(zip(letters, feedback)):
             # Skip the lie column in Fibble mode
             if i == ignore_column:
                 continue
                 
             if fb == Feedback.correct:
-                self.correct_pos[i] = letter
-                confirmed[letter] = confirmed.get(letter, 0) + 1
+                self.correct_pos[i] = k
+                confirmed[k] = confirmed.get(k, 0) + 1
             elif fb == Feedback.present:
-                self.excluded_pos[i].add(letter)
-                confirmed[letter] = confirmed.get(letter, 0) + 1
+                self.excluded_pos[i] |= 1 << k
+                confirmed[k] = confirmed.get(k, 0) + 1
         
-        for letter, count in confirmed.items():
-            self.min_count[letter] = max(self.min_count.get(letter, 0), count)
+        for k, count in confirmed.items():
+            if count > self.min_count[k]:
+                self.min_count[k] = count
+            self._required_letters |= 1 << k
         
-        for i, (letter, fb) in enumerate(zip(word, feedback)):
+        for i, (k, fb) in enumerate(zip(letters, feedback)):
             # Skip the lie column in Fibble mode
             if i == ignore_column:
                 continue
                 
             if fb == Feedback.incorrect:
-                self.max_count[letter] = confirmed.get(letter, 0)
-                if confirmed.get(letter, 0) == 0:
-                    for j in range(5):
-                        if j != ignore_column:  # Don't add exclusions based on lie column
-                            self.excluded_pos[j].add(letter)
+                self.max_count[k] = confirmed.get(k, 0)
+                if confirmed.get(k, 0) == 0:
+                    bit = 1 << k
+                    self._forbidden_letters |= bit
+                    for j in columns:
+                        excluded_pos[j] |= bit
+                else:
+                    # A later guess can lift an earlier max of 0 (Fibble lies)
+                    self._forbidden_letters &= ~(1 << k)
+    
+    def compile(self) -> tuple:
+        """
+        Convert the constraint lists into bitmasks for matches():
+        per-position allowed-letter masks (correct letter, minus exclusions)
+        and nibble-packed min/max letter counts.
+        """
+        if self._compiled is None:
+            allowed = tuple((1 << k if k >= 0 else _ALL_LETTERS) & ~excluded
+                            for k, excluded in zip(self.correct_pos, self.excluded_pos))
+            
+            min_packed = 0
+            max_packed = 0
+            for k, (min_c, max_c) in enumerate(zip(self.min_count, self.max_count)):
+                min_packed |= min_c << (4 * k)
+                max_packed |= max_c << (4 * k)
+            
+            self._compiled = (allowed, min_packed, max_packed | _NIBBLE_HIGH_BITS)
+        return self._compiled
+    
+    def freeze(self) -> tuple:
+        """Hashable snapshot of the constraints, used to memoize filter()"""
+        return (tuple(self.correct_pos), tuple(self.excluded_pos),
+                tuple(self.min_count), tuple(self.max_count))
+    
+    def filter(self) -> int:
+        """Bitmask (bit i = WORDS_TUPLE[i]) of every word satisfying all constraints"""
+        return _cached_filter(self.freeze())
     
     def matches(self, word: str) -> bool:
         """Check if word satisfies all constraints"""
         word = word.lower()
+        idx = WORD_TO_IDX.get(word)
+        present, pos, counts = WORD_META[idx] if idx is not None else _word_meta(word)
         
-        for pos, letter in self.correct_pos.items():
-            if word[pos] != letter:
-                return False
+        # Cheapest checks first: most words are rejected by one AND on letter presence
+        if present & self._forbidden_letters:
+            return False
+        required = self._required_letters
+        if present & required != required:
+            return False
         
-        for pos, excluded in self.excluded_pos.items():
-            if word[pos] in excluded:
-                return False
+        allowed, min_packed, max_packed = self.compile()
+        a0, a1, a2, a3, a4 = allowed
+        p0, p1, p2, p3, p4 = pos
+        if not (p0 & a0 and p1 & a1 and p2 & a2 and p3 & a3 and p4 & a4):
+            return False
         
-        counts = {}
-        for c in word:
-            counts[c] = counts.get(c, 0) + 1
-        
-        for letter, min_c in self.min_count.items():
-            if counts.get(letter, 0) < min_c:
-                return False
-        
-        for letter, max_c in self.max_count.items():
-            if counts.get(letter, 0) > max_c:
-                return False
-        
-        return True
+        # SWAR compare of all 26 counts at once: each nibble is biased by 8,
+        # so bit 3 of a nibble survives the subtraction only if no borrow
+        # was needed, i.e. count >= min (resp. max >= count)
+        return (((counts | _NIBBLE_HIGH_BITS) - min_packed) & _NIBBLE_HIGH_BITS == _NIBBLE_HIGH_BITS
+                and (max_packed - counts) & _NIBBLE_HIGH_BITS == _NIBBLE_HIGH_BITS)
 
 
 # Optimal starting words (information-theoretic best)
 STARTERS = ["salet", "reast", "crate", "trace", "slate", "crane", "slant"]
 
-# Word list - common 5-letter English words
-WORDS = {
-    "aback", "abase", "abate", "abbey", "abbot", "abhor", "abide", "abort",
-    "about", "above", "abuse", "abyss", "acorn", "acrid", "actor", "acute",
-    "adage", "adapt", "admit", "adobe", "adopt", "adore", "adorn", "adult",
-    "aegis", "after", "again", "agape", "agate", "agent", "agile", "aging",
-    "agony", "agree", "ahead", "aisle", "alarm", "album", "alert", "algae",
-    "alibi", "alien", "align", "alike", "alive", "allay", "alley", "allot",
-    "allow", "alloy", "aloft", "alone", "along", "aloof", "aloud", "alpha",
-    "altar", "alter", "amass", "amaze", "amber", "amble", "amend", "amiss",
-    "among", "ample", "amuse", "angel", "anger", "angle", "angry", "angst",
-    "anime", "ankle", "annex", "annoy", "antic", "anvil", "aorta", "apart",
-    "aphid", "apple", "apply", "apron", "arbor", "ardor", "arena", "argue",
-    "arise", "armor", "aroma", "arose", "array", "arrow", "arson", "artsy",
-    "ascot", "ashen", "aside", "askew", "asset", "atlas", "atoll", "atone",
-    "attic", "audio", "audit", "augur", "aunty", "avail", "avert", "avoid",
-    "await", "awake", "award", "aware", "awful", "awoke", "axial", "axiom",
-    "azure", "bacon", "badge", "badly", "bagel", "baggy", "baker", "balmy",
-    "banal", "banjo", "barge", "baron", "basal", "basic", "basil", "basin",
-    "basis", "batch", "bathe", "baton", "batty", "beach", "beady", "beard",
-    "beast", "beech", "beefy", "began", "begin", "begun", "being", "belch",
-    "belie", "belle", "belly", "below", "bench", "beret", "berry", "berth",
-    "beset", "bevel", "bible", "bicep", "bight", "bilge", "binge", "bingo",
-    "birch", "birth", "bison", "black", "blade", "blame", "bland", "blank",
-    "blare", "blast", "blaze", "bleak", "bleat", "bleed", "blend", "bless",
-    "blimp", "blind", "blink", "bliss", "blitz", "bloat", "block", "bloke",
-    "blond", "blood", "bloom", "blown", "blues", "bluff", "blunt", "blurb",
-    "blurt", "blush", "board", "boast", "bobby", "bongo", "bonus", "boost",
-    "booth", "booty", "booze", "borax", "borne", "bosom", "bossy", "botch",
-    "bough", "bound", "bowel", "boxer", "brace", "braid", "brain", "brake",
-    "brand", "brash", "brass", "brave", "bravo", "brawl", "brawn", "bread",
-    "break", "breed", "briar", "bribe", "brick", "bride", "brief", "brine",
-    "bring", "brink", "brisk", "broad", "broil", "broke", "brood", "brook",
-    "broom", "broth", "brown", "brunt", "brush", "brute", "buddy", "budge",
-    "buggy", "bugle", "build", "built", "bulge", "bulky", "bully", "bunch",
-    "bunny", "burly", "burnt", "burst", "bushy", "butch", "buyer", "bylaw",
-    "cabal", "cabby", "cabin", "cable", "cacao", "cache", "cacti", "caddy",
-    "cadet", "camel", "cameo", "canal", "candy", "canny", "canoe", "caper",
-    "carat", "cargo", "carol", "carry", "carve", "caste", "catch", "cater",
-    "catty", "caulk", "cause", "cease", "cedar", "cello", "chafe", "chaff",
-    "chain", "chair", "chalk", "champ", "chant", "chaos", "chard", "charm",
-    "chart", "chase", "chasm", "cheap", "cheat", "check", "cheek", "cheer",
-    "chess", "chest", "chick", "chide", "chief", "child", "chili", "chill",
-    "chimp", "china", "chirp", "choir", "choke", "chord", "chore", "chose",
-    "chuck", "chump", "chunk", "churn", "chute", "cider", "cigar", "cinch",
-    "circa", "civic", "civil", "clack", "claim", "clamp", "clang", "clank",
-    "clash", "clasp", "class", "clean", "clear", "cleat", "cleft", "clerk",
-    "click", "cliff", "climb", "cling", "cloak", "clock", "clone", "close",
-    "cloth", "cloud", "clout", "clown", "clubs", "cluck", "clump", "clung",
-    "coach", "coast", "cobra", "cocoa", "colon", "color", "comet", "comfy",
-    "comic", "comma", "conch", "condo", "coral", "corny", "couch", "cough",
-    "could", "count", "coupe", "court", "coven", "cover", "covet", "cower",
-    "crack", "craft", "cramp", "crane", "crank", "crash", "crass", "crate",
-    "crave", "crawl", "craze", "crazy", "creak", "cream", "credo", "creed",
-    "creek", "creep", "creme", "crepe", "crept", "crest", "crick", "cried",
-    "crime", "crimp", "crisp", "croak", "crock", "crone", "crony", "crook",
-    "cross", "crowd", "crown", "crude", "cruel", "crush", "crust", "crypt",
-    "cubic", "cumin", "cupid", "curly", "curry", "curse", "curve", "cyber",
-    "cycle", "cynic", "daddy", "daily", "dairy", "daisy", "dance", "dandy",
-    "datum", "dealt", "death", "debit", "debug", "debut", "decal", "decay",
-    "decor", "decoy", "decry", "defer", "deity", "delay", "delta", "delve",
-    "demon", "demur", "denim", "dense", "depot", "depth", "derby", "deter",
-    "devil", "diary", "dicey", "digit", "dimly", "diner", "dingo", "dingy",
-    "dirty", "disco", "ditch", "ditto", "ditty", "diver", "dizzy", "dodge",
-    "dogma", "doing", "dolly", "donor", "donut", "doubt", "dough", "dowdy",
-    "dowel", "dowry", "dozen", "draft", "drain", "drake", "drama", "drank",
-    "drape", "drawl", "drawn", "dread", "dream", "dress", "dried", "drier",
-    "drift", "drill", "drink", "drive", "droit", "droll", "drone", "drool",
-    "droop", "dross", "drove", "drown", "drugs", "drunk", "dryer", "dryly",
-    "duchy", "dully", "dummy", "dumpy", "dunce", "dusky", "dusty", "dutch",
-    "dwarf", "dwell", "dying", "eager", "eagle", "early", "earth", "easel",
-    "eaten", "eater", "ebony", "edict", "edify", "eerie", "eight", "eject",
-    "elbow", "elder", "elect", "elegy", "elfin", "elite", "elope", "elude",
-    "elves", "email", "embed", "ember", "empty", "enact", "endow", "enemy",
-    "enjoy", "ennui", "ensue", "enter", "entry", "envoy", "epoch", "epoxy",
-    "equal", "equip", "erase", "erect", "erode", "error", "erupt", "essay",
-    "ether", "ethic", "ethos", "evade", "event", "every", "evict", "evoke",
-    "exact", "exalt", "excel", "exert", "exile", "exist", "expat", "expel",
-    "extol", "extra", "exude", "exult", "fable", "facet", "faint", "fairy",
-    "faith", "false", "famed", "fancy", "fatal", "fatty", "fault", "fauna",
-    "favor", "feast", "feign", "felon", "femur", "fence", "feral", "ferry",
-    "fetal", "fetch", "fetid", "fetus", "fever", "fewer", "fiber", "fibre",
-    "field", "fiend", "fiery", "fifth", "fifty", "fight", "filch", "filet",
-    "filly", "filmy", "filth", "final", "finch", "first", "fishy", "fixed",
-    "fixer", "fizzy", "fjord", "flack", "flail", "flair", "flake", "flaky",
-    "flame", "flank", "flare", "flash", "flask", "fleck", "flesh", "flick",
-    "flier", "fling", "flint", "flirt", "float", "flock", "flood", "floor",
-    "floss", "flour", "flout", "flown", "fluff", "fluid", "fluke", "flung",
-    "flunk", "flush", "flute", "foamy", "focal", "focus", "foggy", "foist",
-    "folly", "foray", "force", "forge", "forgo", "forte", "forth", "forty",
-    "forum", "found", "foyer", "frail", "frame", "frank", "fraud", "freak",
-    "freed", "fresh", "friar", "fried", "frill", "frisk", "frizz", "frock",
-    "frond", "front", "frost", "froth", "frown", "froze", "fruit", "fudge",
-    "fugue", "fully", "fungi", "funky", "funny", "furor", "furry", "fussy",
-    "fuzzy", "gaffe", "gaily", "gamer", "gamma", "gamut", "gassy", "gaudy",
-    "gauge", "gaunt", "gauze", "gavel", "gawky", "gazer", "geeky", "geese",
-    "genie", "genre", "ghost", "giant", "giddy", "girth", "giver", "gizmo",
-    "glade", "gland", "glare", "glass", "glaze", "gleam", "glean", "glide",
-    "glint", "gloat", "globe", "gloom", "glory", "gloss", "glove", "glyph",
-    "gnash", "gnome", "godly", "going", "golly", "gonad", "goner", "gooey",
-    "goofy", "goose", "gorge", "gouge", "gourd", "grace", "grade", "graft",
-    "grail", "grain", "grand", "grant", "grape", "graph", "grasp", "grass",
-    "grate", "grave", "gravy", "graze", "great", "greed", "green", "greet",
-    "grief", "grill", "grime", "grimy", "grind", "gripe", "grits", "groan",
-    "groin", "groom", "grope", "gross", "group", "grout", "grove", "growl",
-    "grown", "gruel", "gruff", "grunt", "guano", "guard", "guava", "guess",
-    "guest", "guide", "guild", "guilt", "guise", "gulch", "gummy", "guppy",
-    "gusto", "gusty", "gypsy", "habit", "haiku", "hairy", "halve", "handy",
-    "happy", "hardy", "harem", "harpy", "harry", "harsh", "haste", "hasty",
-    "hatch", "hater", "haunt", "haven", "havoc", "hazel", "heady", "heard",
-    "heart", "heath", "heave", "heavy", "hedge", "hefty", "heist", "hello",
-    "hence", "heron", "hilly", "hinge", "hippo", "hippy", "hitch", "hoard",
-    "hobby", "hoist", "holly", "homer", "honey", "honor", "horde", "horny",
-    "horse", "hotel", "hotly", "hound", "house", "hovel", "hover", "howdy",
-    "hubby", "human", "humid", "humor", "humus", "hunch", "hunky", "hurry",
-    "husky", "hussy", "hyena", "hymen", "hyper", "icier", "icing", "ideal",
-    "idiom", "idiot", "idler", "idyll", "igloo", "image", "imbue", "impel",
-    "imply", "inane", "incur", "index", "indie", "inept", "inert", "infer",
-    "ingot", "inlay", "inlet", "inner", "input", "inter", "intro", "ionic",
-    "irate", "irony", "islet", "issue", "itchy", "ivory", "jaunt", "jazzy",
-    "jeans", "jelly", "jenny", "jerky", "jewel", "jiffy", "jimmy", "joint",
-    "joist", "joker", "jolly", "joust", "judge", "juice", "juicy", "jumbo",
-    "jumpy", "junco", "junky", "juror", "karma", "kayak", "kebab", "khaki",
-    "kinky", "kiosk", "kitty", "knack", "knead", "kneed", "kneel", "knelt",
-    "knife", "knock", "knoll", "known", "koala", "krill", "label", "labor",
-    "laden", "ladle", "lager", "lance", "lanky", "lapel", "lapse", "large",
-    "larva", "lasso", "latch", "later", "latex", "lathe", "latte", "laugh",
-    "layer", "leach", "leafy", "leaky", "leant", "leapt", "learn", "lease",
-    "leash", "least", "leave", "ledge", "leech", "leery", "legal", "leggy",
-    "lemon", "lemur", "leper", "level", "lever", "libel", "light", "liken",
-    "lilac", "limbo", "limit", "lined", "linen", "liner", "lingo", "lipid",
-    "liter", "lithe", "lived", "liven", "liver", "livid", "llama", "loamy",
-    "loath", "lobby", "local", "locus", "lodge", "lofty", "logic", "login",
-    "loins", "loner", "loopy", "loose", "lorry", "loser", "louse", "lousy",
-    "loved", "lover", "lower", "lowly", "loyal", "lucid", "lucky", "lumen",
-    "lumpy", "lunar", "lunch", "lunge", "lusty", "lying", "lymph", "lynch",
-    "lyric", "macaw", "macho", "macro", "madam", "madly", "mafia", "magic",
-    "magma", "maize", "major", "maker", "mambo", "mamma", "manga", "mange",
-    "mango", "mangy", "mania", "manic", "manly", "manor", "maple", "march",
-    "marry", "marsh", "mason", "match", "mater", "matey", "mauve", "maxim",
-    "maybe", "mayor", "mealy", "meant", "meaty", "mecca", "medal", "media",
-    "medic", "melee", "melon", "mercy", "merge", "merit", "merry", "messy",
-    "metal", "meter", "metro", "micro", "midst", "might", "milky", "mimic",
-    "mince", "mined", "miner", "minim", "minor", "minty", "minus", "mirth",
-    "miser", "missy", "misty", "miter", "mixed", "mixer", "model", "modem",
-    "mogul", "moist", "molar", "moldy", "money", "month", "mooch", "moody",
-    "moose", "moped", "moral", "moron", "morph", "mossy", "motel", "motif",
-    "motor", "motto", "moult", "mound", "mount", "mourn", "mouse", "mousy",
-    "mouth", "moved", "mover", "movie", "mower", "mucky", "mucus", "muddy",
-    "mulch", "mummy", "munch", "mural", "murky", "mushy", "music", "musky",
-    "musty", "myrrh", "nadir", "naive", "named", "nanny", "nasal", "nasty",
-    "natal", "naval", "navel", "needy", "neigh", "nerve", "nervy", "never",
-    "newer", "newly", "nicer", "niche", "niece", "nifty", "night", "ninja",
-    "ninny", "ninth", "nippy", "noble", "nobly", "noise", "noisy", "nomad",
-    "noose", "north", "notch", "noted", "novel", "nudge", "nurse", "nutty",
-    "nylon", "nymph", "oaken", "oasis", "occur", "ocean", "octet", "odder",
-    "oddly", "offal", "offer", "often", "oiled", "olden", "older", "olive",
-    "omega", "onion", "onset", "opera", "optic", "orbit", "order", "organ",
-    "other", "otter", "ought", "ounce", "outdo", "outer", "outgo", "ovary",
-    "overt", "owing", "owner", "oxide", "ozone", "paddy", "pagan", "paint",
-    "panda", "panel", "panic", "pansy", "pants", "papal", "paper", "parka",
-    "party", "pasta", "paste", "pasty", "patch", "patio", "patsy", "patty",
-    "pause", "payee", "payer", "peace", "peach", "pearl", "pecan", "pedal",
-    "penal", "penny", "perch", "peril", "perky", "pesky", "pesto", "petal",
-    "petty", "phase", "phone", "phony", "photo", "piano", "picky", "piece",
-    "piety", "piggy", "pilot", "pinch", "piney", "pinky", "pinto", "pious",
-    "piper", "pitch", "pithy", "pivot", "pixel", "pixie", "pizza", "place",
-    "plaid", "plain", "plane", "plank", "plant", "plate", "plaza", "plead",
-    "pleas", "pleat", "plied", "plier", "plods", "pluck", "plumb", "plume",
-    "plump", "plunk", "plush", "poach", "poems", "point", "poise", "poker",
-    "polar", "polka", "polyp", "pooch", "poppy", "porch", "poser", "posit",
-    "posse", "pouch", "pound", "power", "prank", "prawn", "preen", "press",
-    "price", "prick", "pride", "pried", "prime", "primo", "print", "prior",
-    "prism", "privy", "prize", "probe", "promo", "prone", "prong", "proof",
-    "prose", "proud", "prove", "prowl", "proxy", "prude", "prune", "psalm",
-    "pubic", "pudgy", "pulse", "punch", "pupil", "puppy", "puree", "purge",
-    "purse", "pushy", "putty", "pygmy", "quack", "quaff", "quail", "qualm",
-    "quark", "quart", "quasi", "queen", "query", "quest", "queue", "quick",
-    "quiet", "quill", "quilt", "quirk", "quota", "quote", "rabbi", "rabid",
-    "racer", "radar", "radii", "radio", "radon", "rainy", "raise", "rajah",
-    "rally", "ranch", "randy", "range", "rapid", "raspy", "ratio", "ratty",
-    "raven", "rayon", "razor", "reach", "react", "reads", "ready", "realm",
-    "reams", "rebel", "rebut", "recap", "recur", "redux", "refer", "regal",
-    "rehab", "reign", "relax", "relay", "relic", "remit", "remix", "renal",
-    "renew", "repay", "repel", "reply", "rerun", "reset", "resin", "retch",
-    "retro", "retry", "reuse", "revel", "rhino", "rhyme", "rider", "ridge",
-    "rifle", "right", "rigid", "rigor", "rinse", "ripen", "risen", "riser",
-    "risky", "ritzy", "rival", "river", "rivet", "roach", "roast", "robin",
-    "robot", "rocks", "rocky", "rodeo", "roger", "rogue", "roomy", "roost",
-    "rotor", "rouge", "rough", "round", "rouse", "route", "rowdy", "rowed",
-    "rower", "royal", "ruddy", "ruder", "rugby", "ruins", "ruled", "ruler",
-    "rules", "rumba", "rumor", "rupee", "rural", "rusty", "sadly", "safer",
-    "saint", "saker", "salad", "salet", "sally", "salon", "salsa", "salty",
-    "salve", "salvo", "saner", "sandy", "sappy", "sassy", "satin", "satyr",
-    "sauce", "saucy", "sauna", "saute", "saved", "saver", "savor", "savoy",
-    "savvy", "scald", "scale", "scalp", "scaly", "scamp", "scant", "scare",
-    "scarf", "scary", "scene", "scent", "scion", "scoff", "scold", "scone",
-    "scoop", "scope", "score", "scorn", "scour", "scout", "scowl", "scram",
-    "scrap", "scree", "screw", "scrub", "seamy", "sedan", "seedy", "segue",
-    "seize", "semen", "sense", "sepia", "serum", "serve", "setup", "seven",
-    "sever", "sewer", "shack", "shade", "shady", "shaft", "shake", "shaky",
-    "shall", "shame", "shank", "shape", "shard", "share", "shark", "sharp",
-    "shave", "shawl", "shear", "sheen", "sheep", "sheer", "sheet", "shelf",
-    "shell", "shift", "shine", "shiny", "ships", "shire", "shirk", "shirt",
-    "shock", "shone", "shook", "shoot", "shops", "shore", "short", "shots",
-    "shout", "shove", "shown", "shows", "showy", "shrew", "shrub", "shrug",
-    "shuck", "shunt", "shush", "shyly", "siege", "sight", "sigma", "silky",
-    "silly", "since", "sinew", "singe", "siren", "sissy", "sixth", "sixty",
-    "sized", "sizer", "sizes", "skate", "skeet", "skein", "skier", "skies",
-    "skiff", "skill", "skimp", "skirt", "skulk", "skull", "skunk", "slack",
-    "slain", "slang", "slant", "slash", "slate", "slave", "sleek", "sleep",
-    "sleet", "slept", "slice", "slick", "slide", "slime", "slimy", "sling",
-    "slink", "slope", "slosh", "sloth", "slump", "slung", "slunk", "slurp",
-    "slush", "slyly", "smack", "small", "smart", "smash", "smear", "smell",
-    "smelt", "smile", "smirk", "smite", "smith", "smock", "smoke", "smoky",
-    "snack", "snafu", "snail", "snake", "snaky", "snare", "snarl", "sneak",
-    "sneer", "snide", "sniff", "snipe", "snoop", "snore", "snort", "snout",
-    "snowy", "snuck", "snuff", "soapy", "sober", "solar", "solid", "solve",
-    "sonar", "sonic", "sooth", "sooty", "sorry", "sorts", "sound", "south",
-    "sowed", "sower", "space", "spade", "spank", "spare", "spark", "spasm",
-    "spawn", "speak", "spear", "speck", "speed", "spell", "spend", "spent",
-    "spice", "spicy", "spied", "spiel", "spike", "spill", "spine", "spiny",
-    "spire", "spite", "splat", "split", "spoil", "spoke", "spoof", "spook",
-    "spool", "spoon", "spore", "sport", "spots", "spout", "spray", "spree",
-    "sprig", "spunk", "spurn", "spurt", "squad", "squat", "squid", "stack",
-    "staff", "stage", "staid", "stain", "stair", "stake", "stale", "stalk",
-    "stall", "stamp", "stand", "stank", "staph", "stare", "stark", "stars",
-    "start", "stash", "state", "stave", "stays", "stead", "steak", "steal",
-    "steam", "steel", "steep", "steer", "stein", "stems", "steps", "stern",
-    "stews", "stick", "stiff", "still", "stilt", "sting", "stink", "stint",
-    "stock", "stoic", "stoke", "stole", "stomp", "stone", "stony", "stood",
-    "stool", "stoop", "stops", "store", "stork", "storm", "story", "stout",
-    "stove", "strap", "straw", "stray", "strep", "strew", "strip", "strut",
-    "stuck", "studs", "study", "stuff", "stump", "stung", "stunk", "stunt",
-    "style", "suave", "sugar", "suite", "sulky", "sully", "sunny", "super",
-    "surer", "surge", "surly", "sushi", "swami", "swamp", "swank", "swarm",
-    "swash", "swath", "swear", "sweat", "sweep", "sweet", "swell", "swept",
-    "swift", "swill", "swine", "swing", "swipe", "swirl", "swish", "swiss",
-    "swoon", "swoop", "sword", "swore", "sworn", "swung", "tabby", "table",
-    "taboo", "tacit", "tacky", "taffy", "taint", "taken", "taker", "tally",
-    "talon", "tamed", "tamer", "tango", "tangy", "taper", "tapir", "tardy",
-    "tarot", "taste", "tasty", "tatty", "taunt", "tawny", "teach", "teams",
-    "teary", "tease", "teddy", "teems", "teens", "teeny", "teeth", "tempo",
-    "tempt", "tends", "tenor", "tense", "tenth", "tents", "tepee", "tepid",
-    "terms", "terra", "terse", "tests", "testy", "thank", "theft", "their",
-    "theme", "there", "these", "thick", "thief", "thigh", "thing", "think",
-    "third", "thong", "thorn", "those", "three", "threw", "throb", "throw",
-    "thrum", "thuds", "thumb", "thump", "tiara", "tibia", "tidal", "tiger",
-    "tight", "tilde", "timer", "timid", "tipsy", "titan", "title", "toast",
-    "today", "toddy", "token", "tonal", "toned", "toner", "tongs", "tonic",
-    "tools", "tooth", "topaz", "topic", "torch", "torso", "total", "totem",
-    "touch", "tough", "tours", "towel", "tower", "towns", "toxic", "trace",
-    "track", "tract", "trade", "trail", "train", "trait", "tramp", "trash",
-    "trawl", "tread", "treat", "trees", "trend", "tress", "triad", "trial",
-    "tribe", "trick", "tried", "trier", "tries", "trill", "trims", "tripe",
-    "trite", "troll", "tromp", "troop", "trope", "troth", "trots", "trout",
-    "trove", "truce", "truck", "truer", "truly", "trump", "trunk", "truss",
-    "trust", "truth", "tryst", "tubal", "tubes", "tulip", "tumor", "tuned",
-    "tuner", "tunic", "turbo", "turns", "tutor", "twain", "twang", "tweak",
-    "tweed", "tweet", "twice", "twigs", "twill", "twine", "twins", "twirl",
-    "twist", "tying", "udder", "ulcer", "ultra", "umbra", "uncle", "uncut",
-    "under", "undid", "undue", "unfed", "unfit", "unify", "union", "unite",
-    "units", "unity", "unlit", "unmet", "untie", "until", "unwed", "unzip",
-    "upper", "upset", "urban", "urine", "usage", "usher", "using", "usual",
-    "usurp", "utter", "vague", "valet", "valid", "valor", "value", "valve",
-    "vapid", "vapor", "vault", "vaunt", "vegan", "veils", "venom", "venue",
-    "verbs", "verge", "verse", "vicar", "video", "views", "vigil", "vigor",
-    "villa", "vines", "vinyl", "viola", "viper", "viral", "virus", "visor",
-    "vista", "vital", "vivid", "vixen", "vocal", "vodka", "vogue", "voice",
-    "voila", "vomit", "voted", "voter", "vouch", "vowel", "vying", "wacky",
-    "waded", "wader", "wafer", "waged", "wager", "wages", "wagon", "waist",
-    "waive", "walks", "walls", "waltz", "wands", "wants", "warty", "waste",
-    "watch", "water", "watts", "waved", "waver", "waves", "waxed", "waxen",
-    "weary", "weave", "wedge", "weeds", "weedy", "weeks", "weigh", "weird",
-    "wells", "welsh", "wench", "whack", "whale", "wharf", "wheat", "wheel",
-    "whelp", "where", "which", "whiff", "while", "whims", "whine", "whiny",
-    "whirl", "whisk", "white", "whole", "whoop", "whose", "widen", "wider",
-    "widow", "width", "wield", "wills", "wince", "winch", "winds", "windy",
-    "wines", "wings", "wiped", "wiper", "wired", "wires", "wiser", "wispy",
-    "witch", "witty", "wives", "woken", "woman", "women", "woods", "woody",
-    "woozy", "wordy", "works", "world", "worms", "worry", "worse", "worst",
-    "worth", "would", "wound", "woven", "wrack", "wrath", "wreak", "wreck",
-    "wrest", "wring", "wrist", "write", "wrong", "wrote", "wrung", "yacht",
-    "yearn", "yeast", "yield", "young", "yours", "youth", "zebra", "zesty",
-    "zonal", "zones", "reast", "tares", "rates", "stare", "tears", "aster",
-    "earns", "nears",
-}
-
-
-def _call_llm(prompt: str) -> Optional[str]:
-    """Call LLM API - supports Groq, Gemini, OpenRouter, Ollama (offline)"""
-    import urllib.request
-    import json
-    import ssl
-    import time
+# Word list - common 5-letter English words, sorted and deduplicated in
+# words.txt next to this module (one word per line), read in a single pass
+WORDS_TUPLE = tuple(Path(__file__).with_name("words.txt").read_text().split())
+WORDS = frozenset(WORDS_TUPLE)
+
+# Stable index of every dictionary word (its line in words.txt), used by the answer bitmasks
+WORD_TO_IDX = {w: i for i, w in enumerate(WORDS_TUPLE)}
+ALL_WORDS_MASK = (1 << len(WORDS_TUPLE)) - 1
+
+_ALL_LETTERS = (1 << 26) - 1
+# 26 four-bit count fields, one per letter; masks of each field's low/high bit
+_NIBBLE_LOW_BITS = int("1" * 26, 16)
+_NIBBLE_HIGH_BITS = _NIBBLE_LOW_BITS * 8
+# Max count of a letter with no known max: above any real count, and fits a nibble
+_NO_MAX = 7
+
+
+def _word_meta(word: str) -> Tuple[int, Tuple[int, ...], int]:
+    """
+    Letter bitmaps for a word: a 26-bit mask of the letters it contains,
+    a one-bit letter mask per position, and its letter counts packed as
+    one nibble per letter (letter k in bits 4k..4k+3)
+    """
+    pos = tuple(1 << (ord(c) - 97) for c in word)
+    present = 0
+    counts = 0
+    for bit, c in zip(pos, word):
+        present |= bit
+        counts += 1 << (4 * (ord(c) - 97))
+    return present, pos, counts
+
+
+# Letter bitmaps for every word, aligned with WORDS_TUPLE
+WORD_META: List[Tuple[int, Tuple[int, ...], int]] = [_word_meta(w) for w in WORDS_TUPLE]
+
+
+def _build_word_masks() -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Per-letter bitsets over WORDS_TUPLE: words with letter k at position i,
+    and words containing letter k at least c times (c = 0..5)
+    """
+    pos_masks = [[0] * 26 for _ in range(5)]
+    count_masks = [[ALL_WORDS_MASK] + [0] * 5 for _ in range(26)]
+    for idx, (present, pos, counts) in enumerate(WORD_META):
+        bit = 1 << idx
+        for i, letter_bit in enumerate(pos):
+            pos_masks[i][letter_bit.bit_length() - 1] |= bit
+        # Read each letter's count from the packed nibbles instead of recounting
+        while present:
+            k = (present & -present).bit_length() - 1
+            for n in range(1, ((counts >> (4 * k)) & 0xF) + 1):
+                count_masks[k][n] |= bit
+            present &= present - 1
+    return pos_masks, count_masks
+
+
+POS_LETTER_MASKS, LETTER_COUNT_MASKS = _build_word_masks()
+# Inverted index: words containing letter k
+CONTAINS = [masks[1] for masks in LETTER_COUNT_MASKS]
+
+
+def _union_masks(letter_masks: List[int], letters: int) -> int:
+    """OR of letter_masks[k] over the letters k set in a 26-bit mask"""
+    mask = 0
+    while letters:
+        low = letters & -letters
+        mask |= letter_masks[low.bit_length() - 1]
+        letters ^= low
+    return mask
+
+# Rows of the guess x answer feedback matrix, built on first use:
+# guess -> per position, the answers (bitmasks, bit i = WORDS_TUPLE[i]) that
+# score that position (gray, yellow, green)
+_digit_rows: Dict[str, Tuple[Tuple[int, int, int], ...]] = {}
+
+
+def _digit_masks(guess: str) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    Bit-sliced feedback for a guess against every answer at once. Each answer
+    is one bit lane, so a position's digit comes from a few ANDs of the
+    position/count bitsets instead of scoring the answers one by one.
+    """
+    row = _digit_rows.get(guess)
+    if row is None:
+        letters = [ord(c) - 97 for c in guess]
+        row = []
+        for i, k in enumerate(letters):
+            green = POS_LETTER_MASKS[i][k]
+            # A non-green position is yellow while copies of its letter are left over:
+            # the answer must have more copies than the earlier guess positions with
+            # this letter plus the later ones that are green. Enumerate which later
+            # ones are green.
+            before = letters[:i].count(k)
+            after = [POS_LETTER_MASKS[p][k] for p in range(i + 1, 5) if letters[p] == k]
+            yellow = 0
+            for greens in range(1 << len(after)):
+                needed = before + greens.bit_count() + 1
+                if needed > 5:
+                    continue
+                mask = LETTER_COUNT_MASKS[k][needed]
+                for j, pos_mask in enumerate(after):
+                    mask &= pos_mask if greens >> j & 1 else ~pos_mask
+                yellow |= mask
+            yellow &= ~green
+            row.append((ALL_WORDS_MASK & ~(green | yellow), yellow, green))
+        row = _digit_rows[guess] = tuple(row)
+    return row
+
+
+def _filter_answers(mask: int, guess: str, pattern: int) -> int:
+    """Answers in mask that would give `pattern` for `guess`"""
+    for digit_masks, digit in zip(_digit_masks(guess), _PATTERN_DIGITS[pattern]):
+        mask &= digit_masks[digit]
+    return mask
+
+
+def _lie_column_filters(history: List[Tuple[bytes, int]]) -> List[int]:
+    """
+    For each column, the answers that give every (letters, pattern) in
+    history exactly except in that column, which may have lied. All five
+    come out of one pass over the history.
+    """
+    by_column = [ALL_WORDS_MASK] * 5
+    for letters, pattern in history:
+        word = bytes(k + 97 for k in letters).decode()
+        digits = [digit_masks[digit]
+                  for digit_masks, digit in zip(_digit_masks(word), _PATTERN_DIGITS[pattern])]
+        for col in range(5):
+            mask = by_column[col]
+            for i in _COLUMNS_EXCEPT[col]:
+                mask &= digits[i]
+            by_column[col] = mask
+    return by_column
+
+
+@lru_cache(maxsize=256)
+def _cached_filter(key: tuple) -> int:
+    """
+    Constraints.filter() for a frozen constraint key, built from the word
+    bitsets in one pass over the positions and letters. Games share many
+    states (every game opens with the same guess), so results are memoized.
+    """
+    correct_pos, excluded_pos, min_count, max_count = key
+    must_not_have = 0
+    for k, max_c in enumerate(max_count):
+        if max_c == 0:
+            must_not_have |= 1 << k
     
-    # Determine which platform to use based on constants
-    try:
-        from constants import LLM_PLATFORM
-    except ImportError:
-        LLM_PLATFORM = "groq"
+    mask = ALL_WORDS_MASK
+    if must_not_have:
+        # Letters known to be absent knock out every word containing them at once
+        mask &= ~_union_masks(CONTAINS, must_not_have)
+    for letter_masks, k, excluded in zip(POS_LETTER_MASKS, correct_pos, excluded_pos):
+        letters = (1 << k if k >= 0 else _ALL_LETTERS) & ~excluded
+        # Intersect with whichever side of the position's alphabet is smaller
+        if letters.bit_count() <= 13:
+            mask &= _union_masks(letter_masks, letters)
+        else:
+            mask &= ~_union_masks(letter_masks, _ALL_LETTERS & ~letters & ~must_not_have)
+    for k, min_c in enumerate(min_count):
+        if min_c:
+            mask &= LETTER_COUNT_MASKS[k][min_c]
+    for k, max_c in enumerate(max_count):
+        if 0 < max_c < 5:
+            mask &= ~LETTER_COUNT_MASKS[k][max_c + 1]
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def _guess_filter(letters: bytes, pattern: int) -> int:
+    """Bitmask of the words consistent with one guess's feedback taken at face value"""
+    constraints = Constraints()
+    constraints.update(letters, pattern)
+    return constraints.filter()
+
+
+def _mask_indices(mask: int) -> List[int]:
+    """Indices of the bits set in an answer bitmask"""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+# LLM response cache: sha1 of (model, prompt) -> response text
+_llm_cache: Dict[str, str] = {}
+
+
+def load_llm_cache(path) -> int:
+    """Load cached LLM responses from a JSON file if it exists. Returns number of entries."""
+    path = Path(path)
+    if path.exists():
+        with open(path) as f:
+            _llm_cache.update(json.load(f))
+    return len(_llm_cache)
+
+
+def save_llm_cache(path):
+    """Persist cached LLM responses to a JSON file"""
+    with open(path, 'w') as f:
+        json.dump(_llm_cache, f)
+
+
+def _llm_cache_key(prompt: str) -> str:
+    """Cache key for a prompt: switching models invalidates every entry"""
+    return hashlib.sha1(f"{LLM_MODEL}\n{prompt}".encode('utf-8')).hexdigest()
+
+
+# Kept-alive HTTP(S) connections, one set per thread since games can call
+# the LLM from several worker threads at once
+_http_local = threading.local()
+
+# Shared TLS context, with certificate verification on
+_SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where() if HAS_CERTIFI else None)
+
+# Online APIs are rate limited: keep requests at least this many seconds apart
+_MIN_REQUEST_INTERVAL = 1.0
+_last_request_time = 0.0
+# Games played in parallel threads share the spacing
+_request_lock = threading.Lock()
+
+
+def _send_post(url: str, body: bytes, headers: Dict[str, str], timeout: float) -> tuple:
+    """
+    POST a body on this thread's kept-alive connection to the host and wait
+    for the response headers. Returns (conns, key, conn, response); the caller
+    reads the body and hands conn back with conns[key] = conn once it's drained.
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
     
-    # Only add delay for online APIs (not needed for local Ollama)
-    if LLM_PLATFORM != "ollama":
-        time.sleep(1.0)
+    conns = getattr(_http_local, 'conns', None)
+    if conns is None:
+        conns = _http_local.conns = {}
+    key = (parts.scheme, parts.netloc)
     
-    # Fix SSL certificate issue on macOS
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
+    while True:
+        conn = conns.pop(key, None)
+        reused = conn is not None
+        if conn is None:
+            if parts.scheme == 'https':
+                conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, context=_SSL_CONTEXT)
+            else:
+                conn = http.client.HTTPConnection(parts.netloc, timeout=timeout)
+        
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            return conns, key, conn, conn.getresponse()
+        except ConnectionError:
+            # The server may have closed an idle kept-alive connection: reconnect once
+            conn.close()
+            if reused:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+
+def _post_json(url: str, body: bytes, headers: Dict[str, str], timeout: float) -> dict:
+    """POST a JSON body and decode the JSON reply, reusing this thread's connection to the host"""
+    conns, key, conn, response = _send_post(url, body, headers, timeout)
+    try:
+        payload = response.read()
+    except Exception:
+        conn.close()
+        raise
     
+    conns[key] = conn
+    if response.status >= 400:
+        raise http.client.HTTPException(f"HTTP Error {response.status}: {response.reason}")
+    return json.loads(payload.decode('utf-8'))
+
+
+def _has_complete_word(text: str) -> bool:
+    """Whether text already holds a finished dictionary word (one the model can't extend)"""
+    text = text.lower()
+    for m in _FIVE_LETTER_RE.finditer(text):
+        if m.end() < len(text) and m.group() in WORDS:
+            return True
+    return False
+
+
+def _post_json_stream(url: str, body: bytes, headers: Dict[str, str], timeout: float,
+                      parse_chunk: Callable[[dict], str]) -> str:
+    """
+    POST a streaming request (newline-delimited JSON chunks) and collect the
+    reply text. Stops reading, and drops the connection so the server stops
+    generating, as soon as the text holds a complete dictionary word.
+    """
+    conns, key, conn, response = _send_post(url, body, headers, timeout)
+    text = ''
+    finished = True
     try:
-        if LLM_PLATFORM == "ollama":
-            # LOCAL model - no API key, no rate limits!
-            try:
-                from constants import OLLAMA_HOST
-            except ImportError:
-                OLLAMA_HOST = "http://localhost:11434"
-            
-            url = f"{OLLAMA_HOST}/api/generate"
-            headers = {"Content-Type": "application/json"}
-            data = {
+        while response.status < 400:
+            line = response.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            text += parse_chunk(chunk)
+            if chunk.get('done'):
+                break
+            if _has_complete_word(text):
+                finished = False
+                break
+        if finished:
+            response.read()
+    except Exception:
+        conn.close()
+        raise
+    
+    if finished:
+        conns[key] = conn
+    else:
+        conn.close()
+    if response.status >= 400:
+        raise http.client.HTTPException(f"HTTP Error {response.status}: {response.reason}")
+    return text
+
+
+# Placeholder for the prompt in a request body template
+_PROMPT_SLOT = "\0"
+
+
+def _json_body_template(data: dict) -> Callable[[str], bytes]:
+    """
+    Pre-encode a request body whose prompt field is _PROMPT_SLOT, returning
+    a function that splices a JSON-encoded prompt into it
+    """
+    prefix, suffix = json.dumps(data).split(json.dumps(_PROMPT_SLOT))
+    prefix, suffix = prefix.encode('utf-8'), suffix.encode('utf-8')
+    return lambda prompt: prefix + json.dumps(prompt).encode('utf-8') + suffix
+
+
+# platform -> (url, headers, body builder, reply parser, timeout, streamed), built on first use.
+# For streamed platforms the parser takes one chunk and returns its text
+_llm_endpoints: Dict[str, tuple] = {}
+
+
+def _require_api_key(name: str, value: Optional[str]):
+    """Fail the request with a clear message when the platform's key is missing"""
+    if value is None:
+        raise ValueError(f"{name} is not set in constants.py")
+
+
+def _llm_endpoint(platform: str) -> tuple:
+    """Request settings for an LLM platform"""
+    if platform in _llm_endpoints:
+        return _llm_endpoints[platform]
+    
+    if platform == "ollama":
+        # LOCAL model - no API key, no rate limits!
+        endpoint = (
+            f"{OLLAMA_HOST}/api/generate",
+            {"Content-Type": "application/json"},
+            _json_body_template({
                 "model": LLM_MODEL,
-                "prompt": prompt,
-                "stream": False,
+                "prompt": _PROMPT_SLOT,
+                "stream": True,
+                # Keep the model loaded between guesses and games
+                "keep_alive": OLLAMA_KEEP_ALIVE,
                 "options": {"temperature": 0.1, "num_predict": 20}
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['response'].strip().lower()
-        
-        elif LLM_PLATFORM == "gemini":
-            from constants import GEMINI_API_KEY
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/{LLM_MODEL}:generateContent?key={GEMINI_API_KEY}"
-            headers = {"Content-Type": "application/json"}
-            data = {
-                "contents": [{"parts": [{"text": prompt}]}],
+            }),
+            lambda chunk: chunk.get('response', ''),
+            60,
+            True,
+        )
+    
+    elif platform == "gemini":
+        _require_api_key("GEMINI_API_KEY", GEMINI_API_KEY)
+        endpoint = (
+            f"https://generativelanguage.googleapis.com/v1beta/models/{LLM_MODEL}:generateContent?key={GEMINI_API_KEY}",
+            {"Content-Type": "application/json"},
+            _json_body_template({
+                "contents": [{"parts": [{"text": _PROMPT_SLOT}]}],
                 "generationConfig": {"temperature": 0.1, "maxOutputTokens": 20}
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            with urllib.request.urlopen(req, timeout=15, context=ssl_context) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['candidates'][0]['content']['parts'][0]['text'].strip().lower()
-        
-        elif LLM_PLATFORM == "openrouter":
-            from constants import OPENROUTER_API_KEY
-            url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {
+            }),
+            lambda result: result['candidates'][0]['content']['parts'][0]['text'],
+            15,
+            False,
+        )
+    
+    elif platform == "openrouter":
+        _require_api_key("OPENROUTER_API_KEY", OPENROUTER_API_KEY)
+        endpoint = (
+            "https://openrouter.ai/api/v1/chat/completions",
+            {
                 "Authorization": f"Bearer {OPENROUTER_API_KEY}",
                 "Content-Type": "application/json",
                 "HTTP-Referer": "https://github.com/wordle-solver",
                 "X-Title": "Wordle Solver"
-            }
-            data = {
+            },
+            _json_body_template({
                 "model": LLM_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
+                "messages": [{"role": "user", "content": _PROMPT_SLOT}],
                 "temperature": 0.1,
                 "max_tokens": 20
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            with urllib.request.urlopen(req, timeout=15, context=ssl_context) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['choices'][0]['message']['content'].strip().lower()
-        
-        else:  # Default: Groq
-            from constants import GROQ_API_KEY
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {
+            }),
+            lambda result: result['choices'][0]['message']['content'],
+            15,
+            False,
+        )
+    
+    else:  # Default: Groq
+        _require_api_key("GROQ_API_KEY", GROQ_API_KEY)
+        endpoint = (
+            "https://api.groq.com/openai/v1/chat/completions",
+            {
                 "Authorization": f"Bearer {GROQ_API_KEY}",
                 "Content-Type": "application/json"
-            }
-            data = {
+            },
+            _json_body_template({
                 "model": LLM_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
+                "messages": [{"role": "user", "content": _PROMPT_SLOT}],
                 "temperature": 0.1,
                 "max_tokens": 10
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            with urllib.request.urlopen(req, timeout=10, context=ssl_context) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['choices'][0]['message']['content'].strip().lower()
-                
+            }),
+            lambda result: result['choices'][0]['message']['content'],
+            10,
+            False,
+        )
+    
+    _llm_endpoints[platform] = endpoint
+    return endpoint
+
+
+def _request_llm(prompt: str) -> Optional[str]:
+    """Call LLM API - supports Groq, Gemini, OpenRouter, Ollama (offline)"""
+    global _last_request_time
+    
+    # Only space out requests for online APIs (not needed for local Ollama),
+    # and only wait for whatever part of the interval has not already passed
+    if LLM_PLATFORM != "ollama":
+        with _request_lock:
+            wait = _MIN_REQUEST_INTERVAL - (time.monotonic() - _last_request_time)
+            if wait > 0:
+                time.sleep(wait)
+            _last_request_time = time.monotonic()
+    
+    try:
+        url, headers, build_body, parse_reply, timeout, streamed = _llm_endpoint(LLM_PLATFORM)
+        if streamed:
+            return _post_json_stream(url, build_body(prompt), headers, timeout, parse_reply).strip().lower()
+        result = _post_json(url, build_body(prompt), headers, timeout)
+        return parse_reply(result).strip().lower()
     except Exception as e:
         print(f"    [LLM Error: {e}]")
         return None
 
 
+def warm_up_solver():
+    """Build the solver's lazily computed tables now, outside any timed region"""
+    # The whole guess x answer feedback matrix: one bit-sliced row per word,
+    # so no guess or filter inside a game pays for building one. Rebuilding it
+    # is faster than unpickling it, so it isn't persisted.
+    for word in WORDS_TUPLE:
+        _digit_masks(word)
+
+
+_FIVE_LETTER_RE = re.compile(r'\b[a-z]{5}\b')
+
+
+@lru_cache(maxsize=1024)
 def _extract_word(text: str) -> Optional[str]:
-    """Extract 5-letter word from response"""
+    """Extract 5-letter word from response (cached LLM replies repeat verbatim)"""
     if not text:
         return None
     text = text.strip().lower()
     if len(text) == 5 and text.isalpha():
         return text
-    words = re.findall(r'\b[a-zA-Z]{5}\b', text)
-    for w in words:
-        if w.lower() in WORDS:
-            return w.lower()
-    return words[0].lower() if words else None
+    # Prefer the first dictionary word, else the first 5-letter token
+    first = None
+    for m in _FIVE_LETTER_RE.finditer(text):
+        w = m.group()
+        if w in WORDS:
+            return w
+        if first is None:
+            first = w
+    return first
+
+
+async def _call_llm_async(prompt: str) -> Optional[str]:
+    """Run _request_llm in a worker thread so concurrent games overlap their requests"""
+    return await asyncio.to_thread(_request_llm, prompt)
+
+
+async def _send_llm_async(prompt: str) -> Tuple[Optional[str], bool]:
+    """Default llm for enter_word_from_ai_async: every prompt is its own request"""
+    return await _call_llm_async(prompt), True
+
+
+class BatchedSolver:
+    """
+    Collects LLM prompts from concurrently running games and sends them as one batch.
+    Prompts arriving within `window` seconds (or until `max_batch_size` are queued)
+    are flushed together; identical prompts in a batch share a single LLM call.
+    At most `max_batch_size` requests are in flight at once; later batches wait.
+    `requests_sent` counts the LLM calls actually made.
+    """
+    def __init__(self, max_batch_size: int = 4, window: float = 0.02):
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        # Running _send tasks, referenced so they aren't garbage collected mid-flight
+        self._tasks: set = set()
+        self.requests_sent = 0
+    
+    async def request(self, prompt: str) -> Tuple[Optional[str], bool]:
+        """
+        Queue a prompt and wait for its response.
+        Returns: (response, sent) where sent is False if the reply was shared
+        from an identical prompt of another game in the same batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        if self._in_flight is None:
+            # Created here so it belongs to the running event loop
+            self._in_flight = asyncio.Semaphore(self.max_batch_size)
+        
+        async def call(prompt: str) -> Optional[str]:
+            async with self._in_flight:
+                self.requests_sent += 1
+                return await _call_llm_async(prompt)
+        
+        try:
+            prompts = list(dict.fromkeys(prompt for prompt, _ in batch))
+            responses = await asyncio.gather(*(call(p) for p in prompts), return_exceptions=True)
+            by_prompt = dict(zip(prompts, responses))
+            answered = set()
+            for prompt, future in batch:
+                if future.done():
+                    continue
+                response = by_prompt[prompt]
+                if isinstance(response, BaseException):
+                    future.set_exception(response)
+                else:
+                    # The first game asking a prompt owns the request, the rest share its reply
+                    future.set_result((response, prompt not in answered))
+                    answered.add(prompt)
+        except BaseException as e:
+            # Cancelled mid-batch: fail the waiting games instead of leaving them hanging
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+
+# Letter frequency weights indexed by letter (a=0), 0.1 for the rest
+_FREQ = {'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7,
+         's': 6.3, 'h': 6.1, 'r': 6.0, 'd': 4.3, 'l': 4.0, 'c': 2.8}
+_LETTER_FREQ = [_FREQ.get(chr(97 + k), 0.1) for k in range(26)]
+
+
+def _score_present(present: int) -> float:
+    """Score a 26-bit present-letters mask: frequency of each distinct letter plus 2 per letter"""
+    score = present.bit_count() * 2
+    while present:
+        low = present & -present
+        score += _LETTER_FREQ[low.bit_length() - 1]
+        present ^= low
+    return score
+
+
+# Scores never change, so every word is scored once at import, by word index
+_IDX_SCORES: Tuple[float, ...] = tuple(_score_present(meta[0]) for meta in WORD_META)
+
+# Most candidates a prompt ever lists
+_TOP_CANDIDATES = 15
+
+
+def _entropy(guess: str, alive: int) -> float:
+    """Expected information (bits) from guessing a word, over the alive answers"""
+    # Split the alive answers into feedback buckets one position at a time
+    buckets = [alive]
+    for gray, yellow, green in _digit_masks(guess):
+        split = []
+        for mask in buckets:
+            for answers in (mask & gray, mask & yellow, mask & green):
+                if answers:
+                    split.append(answers)
+        buckets = split
+    n = alive.bit_count()
+    return math.log2(n) - sum(c * math.log2(c) for c in map(int.bit_count, buckets)) / n
+
+
+# Past this many candidates only the best by letter score get an entropy
+_ENTROPY_MAX_CANDIDATES = 300
 
 
-def _score_word(word: str) -> float:
-    """Score word by letter frequency"""
-    freq = {'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7,
-            's': 6.3, 'h': 6.1, 'r': 6.0, 'd': 4.3, 'l': 4.0, 'c': 2.8}
-    return sum(freq.get(c, 0.1) for c in set(word)) + len(set(word)) * 2
+def _rank_candidates(candidates: List[int], alive: int) -> List[str]:
+    """
+    Best candidates (word indices) first, by expected information over the
+    alive answers (letter score breaks ties). Up to _TOP_CANDIDATES words are returned.
+    """
+    if len(candidates) < 3:
+        # Every guess splits two answers the same way: letter score decides
+        return [WORDS_TUPLE[i] for i in sorted(candidates, key=_IDX_SCORES.__getitem__, reverse=True)]
+    if len(candidates) > _ENTROPY_MAX_CANDIDATES:
+        candidates = heapq.nlargest(_ENTROPY_MAX_CANDIDATES, candidates, key=_IDX_SCORES.__getitem__)
+    best = heapq.nlargest(_TOP_CANDIDATES, candidates,
+                          key=lambda i: (_entropy(WORDS_TUPLE[i], alive), _IDX_SCORES[i]))
+    return [WORDS_TUPLE[i] for i in best]
 
 
 # =============================================================================
@@ -550,13 +929,7 @@ def _score_word(word: str) -> float:
 class GameState:
     """Main game state for Wordle/Fibble"""
     
-    # Class-level solver state (persists across guesses within a game)
-    _constraints: Optional[Constraints] = None
-    _candidates: List[str] = []
-    _guess_num: int = 0
-    _history: List[Tuple[str, List[Feedback]]] = []
-    
-    def __init__(self, show_window: bool = True, logging: bool = True):
+    def __init__(self, show_window: bool = True, logging: bool = True, target: Optional[str] = None):
         self.show_window = show_window
         self.logging = logging
         
@@ -572,37 +945,57 @@ class GameState:
         self.success = False
         self.was_valid_guess = False
         
-        # Word list for targets
-        self.word_list = list(WORDS)
+        # LLM usage this game: requests actually sent, replies served from the cache,
+        # and replies shared from another game's identical request in a batch
+        self.llm_requests = 0
+        self.llm_cache_hits = 0
+        self.llm_shared_replies = 0
         
         # Fibble lie tracking
         self.lie_column = None
         self.lies_given = 0
         
-        self.reset()
+        # Solver state (per instance so several games can run concurrently)
+        self._constraints: Optional[Constraints] = None
+        self._candidate_idx: List[int] = []  # word indices still possible
+        self._candidate_mask = ALL_WORDS_MASK
+        self._guessed_mask = 0  # bits of the dictionary words guessed so far
+        self._guess_num = 0
+        self._history: List[Tuple[bytes, int]] = []  # (letters, pattern) per guess
+        
+        self.reset(target)
     
-    def reset(self):
-        """Reset game for a new round"""
+    def reset(self, target: Optional[str] = None, rng: Optional[random.Random] = None):
+        """
+        Reset game for a new round (random target unless one is given).
+        rng draws the target and Fibble lie column (default: the global random module).
+        """
+        rng = rng or random
         self.words = []
         self.current_word_index = 0
-        self.target_word = random.choice(self.word_list)
+        self.target_word = target.lower() if target else WORDS_TUPLE[rng.randrange(len(WORDS_TUPLE))]
         self.status = Status.playing
         self.success = False
         self.was_valid_guess = False
+        self.llm_requests = 0
+        self.llm_cache_hits = 0
+        self.llm_shared_replies = 0
         
         # Fibble setup
         if self.num_lies > 0:
-            self.lie_column = random.randint(0, 4)
+            self.lie_column = rng.randint(0, 4)
             self.lies_given = 0
         else:
             self.lie_column = None
             self.lies_given = 0
         
         # Reset solver state
-        GameState._constraints = Constraints()
-        GameState._candidates = list(WORDS)
-        GameState._guess_num = 0
-        GameState._history = []
+        self._constraints = Constraints()
+        self._candidate_idx = []  # rebuilt from _candidate_mask on the next guess
+        self._candidate_mask = ALL_WORDS_MASK
+        self._guessed_mask = 0
+        self._guess_num = 0
+        self._history = []
         
         if self.logging:
             print(f"New game. Target: {self.target_word}")
@@ -614,11 +1007,14 @@ class GameState:
         word = Word()
         word.set_word(guess)
         
-        feedback = self._calculate_feedback(guess)
-        word.set_feedback(feedback)
+        pattern = self._calculate_feedback(guess)
+        word.set_pattern(pattern)
         
         self.words.append(word)
         self.current_word_index = len(self.words)
+        idx = WORD_TO_IDX.get(guess)
+        if idx is not None:
+            self._guessed_mask |= 1 << idx
         
         if guess == self.target_word:
             self.success = True
@@ -628,48 +1024,28 @@ class GameState:
             self.status = Status.end
         
         if self.logging:
-            fb_str = ''.join(['🟩' if f == Feedback.correct else '🟨' if f == Feedback.present else '⬛' for f in feedback])
-            print(f"  {guess.upper()} {fb_str}")
+            print(f"  {guess.upper()} {_PATTERN_EMOJI[pattern]}")
     
-    def _calculate_feedback(self, guess: str) -> List[Feedback]:
-        """Calculate feedback for a guess"""
-        guess = guess.lower()
-        target = self.target_word.lower()
-        
-        feedback = [Feedback.incorrect] * 5
-        target_letters = list(target)
-        
-        # First pass: greens
-        for i in range(5):
-            if guess[i] == target[i]:
-                feedback[i] = Feedback.correct
-                target_letters[i] = None
-        
-        # Second pass: yellows
-        for i in range(5):
-            if feedback[i] == Feedback.incorrect:
-                if guess[i] in target_letters:
-                    feedback[i] = Feedback.present
-                    target_letters[target_letters.index(guess[i])] = None
+    def _calculate_feedback(self, guess: str) -> int:
+        """Calculate feedback for a guess as a packed pattern"""
+        pattern = _feedback_code(guess.lower(), self.target_word.lower())
         
         # Fibble: apply lie
         if self.num_lies > 0 and self.lies_given < self.num_lies:
-            feedback = self._apply_lie(feedback)
+            pattern = self._apply_lie(pattern)
         
-        return feedback
+        return pattern
     
-    def _apply_lie(self, feedback: List[Feedback]) -> List[Feedback]:
+    def _apply_lie(self, pattern: int) -> int:
         """Apply lie for Fibble"""
         if self.lie_column is not None and self.lies_given < self.num_lies:
-            col = self.lie_column
-            if feedback[col] == Feedback.correct:
-                feedback[col] = Feedback.incorrect
-            elif feedback[col] == Feedback.present:
-                feedback[col] = Feedback.incorrect
-            else:
-                feedback[col] = Feedback.present
+            weight = 3 ** self.lie_column
+            fb = pattern // weight % 3
+            # correct/present become incorrect, incorrect becomes present
+            lie = Feedback.present if fb == Feedback.incorrect else Feedback.incorrect
+            pattern += (lie - fb) * weight
             self.lies_given += 1
-        return feedback
+        return pattern
     
     def num_of_tries(self) -> int:
         """Return number of guesses made"""
@@ -678,142 +1054,219 @@ class GameState:
     def enter_word_from_ai(self) -> int:
         """
         Get word from AI solver and enter it.
-        Returns: number of LLM calls made.
+        Returns: number of LLM attempts, cache hits included (real requests
+        are counted in self.llm_requests).
         """
-        GameState._guess_num += 1
+        prompt, scored = self._prepare_ai_guess()
+        if prompt is None:
+            return 0
         
-        # First guess: optimal starter
-        if GameState._guess_num == 1:
-            guess = STARTERS[0]
-            self.enter_word(guess)
-            self.was_valid_guess = True
+        attempts = 0
+        previous = None
+        for attempt in range(MAX_LLM_CONTINUOUS_CALLS):
+            resp = self._cached_reply(prompt, previous)
+            if resp is None:
+                resp = _request_llm(prompt)
+                self.llm_requests += 1
+            attempts += 1
+            previous = prompt
+            prompt = self._handle_llm_response(resp, prompt, scored)
+            if prompt is None:
+                return attempts
+        
+        # Fallback
+        self._enter_ai_word(scored[0])
+        return attempts
+    
+    async def enter_word_from_ai_async(self, llm=None) -> int:
+        """
+        Async version of enter_word_from_ai, used to run several games at once.
+        llm: async callable prompt -> (response, sent), sent False when the reply
+        was shared from another game's request (defaults to _request_llm in a thread).
+        Returns: number of LLM attempts, cache hits and shared replies included.
+        """
+        llm = llm or _send_llm_async
+        prompt, scored = self._prepare_ai_guess()
+        if prompt is None:
             return 0
         
+        attempts = 0
+        previous = None
+        for attempt in range(MAX_LLM_CONTINUOUS_CALLS):
+            resp = self._cached_reply(prompt, previous)
+            if resp is None:
+                resp, sent = await llm(prompt)
+                if sent:
+                    self.llm_requests += 1
+                else:
+                    self.llm_shared_replies += 1
+            attempts += 1
+            previous = prompt
+            prompt = self._handle_llm_response(resp, prompt, scored)
+            if prompt is None:
+                return attempts
+        
+        # Fallback
+        self._enter_ai_word(scored[0])
+        return attempts
+    
+    def _cached_reply(self, prompt: str, previous: Optional[str]) -> Optional[str]:
+        """
+        Cached LLM reply for a prompt, if any. A prompt repeated from the
+        previous attempt (the reply had no word to correct) always goes to the LLM.
+        """
+        if prompt == previous:
+            return None
+        resp = _llm_cache.get(_llm_cache_key(prompt))
+        if resp is not None:
+            self.llm_cache_hits += 1
+        return resp
+    
+    def _enter_ai_word(self, guess: str):
+        """Enter a word chosen by the solver"""
+        self.enter_word(guess)
+        self.was_valid_guess = True
+    
+    def _is_candidate(self, guess: str) -> bool:
+        """Whether a guess is still consistent with all feedback so far"""
+        # One bit test against the alive mask
+        idx = WORD_TO_IDX.get(guess)
+        if idx is not None:
+            return (self._candidate_mask >> idx) & 1 == 1
+        # Fibble accepts words outside the list if they fit the constraints
+        return self.num_lies > 0 and self._constraints.matches(guess)
+    
+    def _prepare_ai_guess(self) -> Tuple[Optional[str], List[str]]:
+        """
+        Update solver state from the last guess and either enter a word directly
+        (returns (None, [])) or build the LLM prompt (returns (prompt, scored)).
+        """
+        self._guess_num += 1
+        
+        # First guess: optimal starter
+        if self._guess_num == 1:
+            self._enter_ai_word(STARTERS[0])
+            return None, []
+        
         # Get feedback from previous guess
         if self.words:
             prev = self.words[-1]
-            word = prev.word.lower()
-            feedback = prev.get_feedback()
             
             # Only update if not already processed
-            if not GameState._history or GameState._history[-1][0] != word:
-                if feedback and len(feedback) == 5:
-                    # For Fibble: try to detect lie column
-                    if self.num_lies > 0:
-                        # Use conservative approach: apply constraints loosely
-                        # Don't fully trust any single column's feedback
-                        GameState._constraints.update(word, feedback)
-                    else:
-                        GameState._constraints.update(word, feedback)
-                    GameState._history.append((word, feedback))
+            if not self._history or self._history[-1][0] != prev.letters:
+                # For Fibble: try to detect lie column
+                if self.num_lies > 0:
+                    # Use conservative approach: apply constraints loosely
+                    # Don't fully trust any single column's feedback
+                    self._constraints.update(prev.letters, prev.pattern)
+                    # Narrow the alive mask by what this guess alone allows
+                    self._candidate_mask &= _guess_filter(prev.letters, prev.pattern)
+                else:
+                    self._constraints.update(prev.letters, prev.pattern)
+                    # Keep only answers that would give exactly this pattern
+                    self._candidate_mask = _filter_answers(self._candidate_mask, prev.word, prev.pattern)
+                self._history.append((prev.letters, prev.pattern))
         
         # Filter candidates
-        guessed_words = {w.word.lower() for w in self.words}
-        GameState._candidates = [w for w in GameState._candidates 
-                                  if GameState._constraints.matches(w) and w not in guessed_words]
+        guessed_mask = self._guessed_mask
+        alive = self._candidate_mask & ~guessed_mask
+        self._candidate_idx = _mask_indices(alive)
         
         # For Fibble: if no candidates, try relaxing constraints
-        if not GameState._candidates and self.num_lies > 0:
+        if not self._candidate_idx and self.num_lies > 0:
             # Try each column as potential lie column
-            for lie_col in range(5):
-                test_constraints = Constraints()
-                for hist_word, hist_fb in GameState._history:
-                    test_constraints.update(hist_word, hist_fb, ignore_column=lie_col)
-                
-                test_candidates = [w for w in WORDS 
-                                   if test_constraints.matches(w) and w not in guessed_words]
+            for lie_col, test_mask in enumerate(_lie_column_filters(self._history)):
+                test_alive = test_mask & ~guessed_mask
                 
-                if test_candidates:
-                    GameState._candidates = test_candidates
-                    GameState._constraints = test_constraints
+                if test_alive:
+                    test_constraints = Constraints()
+                    for hist_letters, hist_pattern in self._history:
+                        test_constraints.update(hist_letters, hist_pattern, ignore_column=lie_col)
+                    alive = test_alive
+                    self._candidate_idx = _mask_indices(alive)
+                    self._candidate_mask = test_mask
+                    self._constraints = test_constraints
                     if self.logging:
                         print(f"    [Fibble: Suspecting lie in column {lie_col}]")
                     break
         
         # Single candidate - no LLM needed
-        if len(GameState._candidates) == 1:
-            guess = GameState._candidates[0]
-            self.enter_word(guess)
-            self.was_valid_guess = True
-            return 0
+        if len(self._candidate_idx) == 1:
+            self._enter_ai_word(WORDS_TUPLE[self._candidate_idx[0]])
+            return None, []
         
         # No candidates - reset
-        if not GameState._candidates:
-            GameState._candidates = [w for w in WORDS 
-                                      if GameState._constraints.matches(w)]
+        if not self._candidate_idx:
+            self._candidate_mask = alive = self._constraints.filter()
+            self._candidate_idx = _mask_indices(alive)
         
         # Still none - fallback
-        if not GameState._candidates:
-            guess = STARTERS[GameState._guess_num % len(STARTERS)]
-            self.enter_word(guess)
-            self.was_valid_guess = True
-            return 0
+        if not self._candidate_idx:
+            self._enter_ai_word(STARTERS[self._guess_num % len(STARTERS)])
+            return None, []
         
-        # Score and sort
-        scored = sorted(GameState._candidates, key=_score_word, reverse=True)
+        # Rank by expected information; the prompt never shows more than 15.
+        # Lies make Fibble's feedback buckets unreliable, so it keeps letter scores
+        if self.num_lies > 0:
+            best = heapq.nlargest(_TOP_CANDIDATES, self._candidate_idx, key=_IDX_SCORES.__getitem__)
+            scored = [WORDS_TUPLE[i] for i in best]
+        else:
+            scored = _rank_candidates(self._candidate_idx, alive)
         
-        # Build detailed prompt like GPT-5 benchmark
+        # Two candidates or the last try: the LLM has nothing useful to add
         tries_left = self.num_guesses - len(self.words)
+        if len(self._candidate_idx) <= 2 or tries_left <= 1:
+            self._enter_ai_word(scored[0])
+            return None, []
         
-        prompt = "You are playing Wordle. Guess a 5-letter word.\n"
+        # Build detailed prompt like GPT-5 benchmark
+        parts = [_PROMPT_HEADER]
         
         # Fibble lie explanation
         if self.num_lies > 0:
-            prompt += f"\nIMPORTANT: There are {self.num_lies} lies in feedback. "
-            prompt += "Lies are ALWAYS in the SAME column for all guesses.\n"
+            parts.append(_FIBBLE_NOTE.format(self.num_lies))
         
         # Previous guesses and feedback
-        if GameState._history:
-            prompt += "\nPrevious guesses:\n"
-            for word, feedback in GameState._history:
-                fb_str = []
-                for letter, fb in zip(word.upper(), feedback):
-                    if fb == Feedback.correct:
-                        fb_str.append(f"{letter}:GREEN")
-                    elif fb == Feedback.present:
-                        fb_str.append(f"{letter}:YELLOW")
-                    else:
-                        fb_str.append(f"{letter}:GRAY")
-                prompt += f"  {word.upper()} -> {', '.join(fb_str)}\n"
+        if self._history:
+            parts.append("\nPrevious guesses:\n")
+            parts.extend(_history_line(letters, pattern) for letters, pattern in self._history)
         
         # Show candidates
-        if len(scored) <= 15:
-            prompt += f"\nValid words: {','.join(scored)}\n"
+        if len(self._candidate_idx) <= _TOP_CANDIDATES:
+            parts.append(f"\nValid words: {','.join(scored)}\n")
         else:
-            prompt += f"\nTop candidates: {','.join(scored[:10])}\n"
+            parts.append(f"\nTop candidates: {','.join(scored[:10])}\n")
         
-        prompt += f"Tries left: {tries_left}\n"
-        prompt += "Reply with ONLY a 5-letter word:"
-        
-        llm_calls = 0
-        for attempt in range(MAX_LLM_CONTINUOUS_CALLS):
-            resp = _call_llm(prompt)
-            llm_calls += 1
+        parts.append(f"Tries left: {tries_left}\n")
+        parts.append(_PROMPT_FOOTER)
+        prompt = ''.join(parts)
+        return prompt, scored
+    
+    def _handle_llm_response(self, resp: Optional[str], prompt: str, scored: List[str]) -> Optional[str]:
+        """
+        Enter the LLM's guess if it is valid (returns None), otherwise return
+        the prompt extended with self-correction hints for the next attempt.
+        """
+        if resp:
+            guess = _extract_word(resp)
+            if guess and self._is_candidate(guess):
+                # Only replies that gave a valid guess are cached (and persisted)
+                _llm_cache[_llm_cache_key(prompt)] = resp
+                self._enter_ai_word(guess)
+                return None
             
-            if resp:
-                guess = _extract_word(resp)
-                if guess and GameState._constraints.matches(guess):
-                    self.enter_word(guess)
-                    self.was_valid_guess = True
-                    return llm_calls
+            # Self-correction like GPT-5 benchmark
+            if guess:
+                reasons = []
+                for i, letter in enumerate(guess):
+                    k = self._constraints.correct_pos[i]
+                    if k >= 0 and ord(letter) - 97 != k:
+                        reasons.append(f"Position {i+1} must be '{chr(k + 65)}'")
+                    if self._constraints.excluded_pos[i] >> (ord(letter) - 97) & 1:
+                        reasons.append(f"'{letter.upper()}' cannot be in position {i+1}")
                 
-                # Self-correction like GPT-5 benchmark
-                if guess:
-                    reasons = []
-                    for i, letter in enumerate(guess):
-                        if i in GameState._constraints.correct_pos:
-                            if letter != GameState._constraints.correct_pos[i]:
-                                reasons.append(f"Position {i+1} must be '{GameState._constraints.correct_pos[i].upper()}'")
-                        if letter in GameState._constraints.excluded_pos.get(i, set()):
-                            reasons.append(f"'{letter.upper()}' cannot be in position {i+1}")
-                    
-                    if reasons:
-                        prompt += f"\n'{guess.upper()}' is invalid: {'; '.join(reasons[:3])}\nTry again:"
-                    else:
-                        prompt += f"\n'{guess.upper()}' not in word list. Pick from: {','.join(scored[:5])}\nTry again:"
-        
-        # Fallback
-        guess = scored[0]
-        self.enter_word(guess)
-        self.was_valid_guess = True
-        return llm_calls
+                if reasons:
+                    prompt += f"\n'{guess.upper()}' is invalid: {'; '.join(reasons[:3])}\nTry again:"
+                else:
+                    prompt += f"\n'{guess.upper()}' not in word list. Pick from: {','.join(scored[:5])}\nTry again:"
+        return prompt
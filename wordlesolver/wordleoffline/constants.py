@@ -5,3 +5,13 @@ LLM_PLATFORM = "ollama"
 
 # Ollama runs locally - no API key needed!
 OLLAMA_HOST = "http://localhost:11434"
+
+# How long Ollama keeps the model loaded after a request (Ollama's own default is 5m)
+OLLAMA_KEEP_ALIVE = "30m"
+
+# The benchmark plays all games concurrently. How many requests Ollama serves
+# in parallel is set on the server, e.g.:
+#   OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=1 ollama serve
+
+# Max prompts per batch, and max requests in flight to Ollama at once (keep <= OLLAMA_NUM_PARALLEL)
+LLM_BATCH_SIZE = 4
@@ -3,8 +3,10 @@ Benchmark runner for LLM Wordle Competition
 Runs multiple games and tracks performance metrics
 """
 
+import random
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Optional: wandb for logging (comment out if not using)
@@ -15,123 +17,148 @@ except ImportError:
     HAS_WANDB = False
     print("wandb not installed - running without logging")
 
-from classes.GameState import GameState, Status
-from classes.LetterCell import Feedback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from classes.GameState import GameState, Status, WORDS_TUPLE, load_llm_cache, save_llm_cache, warm_up_solver
 from constants import LLM_MODEL, MAX_LLM_CONTINUOUS_CALLS
 
 LOG_DIR = Path("benchmarks/logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "llm_wordle_results.json"
+LLM_CACHE_FILE = LOG_DIR / "llm_cache.json"
 
 NUM_RUNS = 10
+PARALLEL_GAMES = 4  # games in flight at once; LLM requests stay spaced by the rate limiter
+SEED = None  # set to an int to replay the same target words
 
 
-def run_game(game: GameState, run_id: int, total_tries: int, total_success: int, 
-             total_bad_guesses: int, total_good_guesses: int, total_latency: float, 
-             total_guess_latency: float, total_guess_count: int, total_llm_calls: int, 
-             results_dict=None):
-    """Run a single game and track metrics"""
-    
-    print(f"\n{'='*40}")
-    print(f"Starting run {run_id + 1}")
-    print(f"{'='*40}")
+def write_json(path, data):
+    """Write data as indented JSON, using orjson when it is installed"""
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def prepare_game(run_id: int, target: str) -> GameState:
+    """Build a game for the given target"""
+    game = GameState(show_window=False, logging=False, target=target)
+
+    # Uncomment for Fibble mode:
+    # game.num_lies = 1
+    # game.num_guesses = 9
+
+    # Games run in parallel threads, so each draws its Fibble lie column from
+    # its own RNG: with SEED set, a run replays regardless of thread order
+    rng = random.Random(f"{SEED}:{run_id}") if SEED is not None else None
+    game.reset(target=target, rng=rng)
+    # Per-guess logs of parallel games would interleave
+    game.logging = PARALLEL_GAMES == 1
+    return game
+
+
+def run_game(run_id: int, target: str) -> dict:
+    """Play a single game to the end and return its metrics (runs in a worker thread)"""
+    game = prepare_game(run_id, target)
     
-    game.reset()
     total_completion = 0
-    completion = 0
-    game_start_time = time.time()
+    good_guesses = 0
+    bad_guesses = 0
+    guess_count = 0
+    guess_latency_ns = 0
+    game_start_ns = time.perf_counter_ns()
+
+    enter_word_from_ai = game.enter_word_from_ai
+    words = game.words
 
     while game.status != Status.end:
-        guess_start_time = time.time()
-        tries = game.enter_word_from_ai()
-        guess_end_time = time.time()
-        guess_latency = guess_end_time - guess_start_time
-        total_guess_latency += guess_latency
-
-        # Get feedback from the last word
-        if game.words:
-            feedback = game.words[-1].get_feedback()
-        else:
-            feedback = []
-
-        # Calculate completion score
-        completion = 0
-        for fdb in feedback:
-            if fdb == Feedback.incorrect:
-                completion += 0
-            elif fdb == Feedback.present:
-                completion += 0.5
-            elif fdb == Feedback.correct:
-                completion += 1
+        guess_start_ns = time.perf_counter_ns()
+        tries = enter_word_from_ai()
+        guess_latency_ns += time.perf_counter_ns() - guess_start_ns
+
+        # Completion score: correct = 1, present = 0.5, incorrect = 0
+        # (Feedback values are 2/1/0, so this is half their sum)
+        completion = sum(words[-1].get_feedback()) / 2 if words else 0
 
         if game.was_valid_guess:
             total_completion += completion
-            total_good_guesses += 1
-            total_bad_guesses += tries - 1 if tries > 0 else 0
-            total_llm_calls += tries
+            good_guesses += 1
+            bad_guesses += tries - 1 if tries > 0 else 0
         else:
-            total_bad_guesses += 1
-            total_llm_calls += 1
+            bad_guesses += 1
+
+        guess_count += 1
 
-        total_guess_count += 1
+    num_tries = game.num_of_tries()
+    return {
+        "run_id": run_id + 1,
+        "target_word": game.target_word,
+        "success": game.success,
+        "tries": num_tries,
+        "average_game_completion": total_completion / num_tries if num_tries > 0 else 0,
+        "latency_ns": time.perf_counter_ns() - game_start_ns,
+        "guess_latency_ns": guess_latency_ns,
+        "guess_count": guess_count,
+        "good_guesses": good_guesses,
+        "bad_guesses": bad_guesses,
+        # Requests actually sent; replies served from the cache are counted apart
+        "llm_calls": game.llm_requests,
+        "llm_cache_hits": game.llm_cache_hits,
+    }
 
-    game_end_time = time.time()
-    game_latency = game_end_time - game_start_time
-    total_latency += game_latency
 
-    avg_game_completion = total_completion / game.num_of_tries() if game.num_of_tries() > 0 else 0
-    total_success += 1 if game.success else 0
-    total_tries += game.num_of_tries()
+def record_game(game: dict, totals: dict, results_dict=None, wandb_rows=None):
+    """Add a finished game to the running totals and print its results"""
+    for key in totals:
+        totals[key] += game[key]
+    n = game["run_id"]
 
     # Print results
-    print(f"\n--- Run {run_id + 1} Results ---")
-    print(f"Success: {'✅ YES' if game.success else '❌ NO'}")
-    print(f"Tries: {game.num_of_tries()}")
-    print(f"Target was: {game.target_word}")
-    print(f"Game latency: {game_latency:.2f}s")
+    print(f"\n--- Run {n} Results ---")
+    print(f"Success: {'✅ YES' if game['success'] else '❌ NO'}")
+    print(f"Tries: {game['tries']}")
+    print(f"Target was: {game['target_word']}")
+    print(f"Game latency: {game['latency_ns'] / 1e9:.2f}s")
     print(f"\n--- Rolling Averages ---")
-    print(f"Avg completion: {avg_game_completion:.2f} / 5")
-    print(f"Avg tries: {total_tries / (run_id + 1):.2f}")
-    print(f"Win rate: {total_success / (run_id + 1):.1%}")
-    print(f"Avg latency: {total_latency / (run_id + 1):.2f}s")
+    print(f"Avg completion: {game['average_game_completion']:.2f} / 5")
+    print(f"Avg tries: {totals['tries'] / n:.2f}")
+    print(f"Win rate: {totals['success'] / n:.1%}")
+    print(f"Avg latency: {totals['latency_ns'] / n / 1e9:.2f}s")
     
-    if total_guess_count > 0:
-        print(f"Avg guess latency: {total_guess_latency / total_guess_count:.2f}s")
+    if totals["guess_count"] > 0:
+        print(f"Avg guess latency: {totals['guess_latency_ns'] / totals['guess_count'] / 1e9:.2f}s")
     
-    if total_bad_guesses > 0:
-        print(f"Good/Bad ratio: {total_good_guesses / total_bad_guesses:.2f}")
+    if totals["bad_guesses"] > 0:
+        print(f"Good/Bad ratio: {totals['good_guesses'] / totals['bad_guesses']:.2f}")
     else:
-        print(f"Good/Bad ratio: {total_good_guesses} (no bad guesses)")
+        print(f"Good/Bad ratio: {totals['good_guesses']} (no bad guesses)")
     
-    if total_good_guesses > 0:
-        print(f"Avg LLM calls/guess: {total_llm_calls / total_good_guesses:.2f}")
+    if totals["good_guesses"] > 0:
+        print(f"Avg LLM calls/guess: {totals['llm_calls'] / totals['good_guesses']:.2f}")
 
-    # Log to wandb if available
-    if HAS_WANDB:
-        wandb.log({
-            "average_game_completion": avg_game_completion,
-            "rolling_avg_tries": total_tries / (run_id + 1),
-            "rolling_avg_success": total_success / (run_id + 1),
-            "rolling_avg_game_latency": total_latency / (run_id + 1),
-            "rolling_avg_guess_latency": total_guess_latency / total_guess_count if total_guess_count > 0 else 0,
-            "good_guess_bad_guess_ratio": total_good_guesses / total_bad_guesses if total_bad_guesses > 0 else total_good_guesses,
-            "avg_llm_calls_per_guess": total_llm_calls / total_good_guesses if total_good_guesses > 0 else 0
-        }, step=(run_id + 1))
+    # Collect a row for wandb; everything is logged in one call at the end
+    if wandb_rows is not None:
+        wandb_rows.append({
+            "run_id": n,
+            "average_game_completion": game["average_game_completion"],
+            "rolling_avg_tries": totals["tries"] / n,
+            "rolling_avg_success": totals["success"] / n,
+            "rolling_avg_game_latency": totals["latency_ns"] / n / 1e9,
+            "rolling_avg_guess_latency": totals["guess_latency_ns"] / totals["guess_count"] / 1e9 if totals["guess_count"] > 0 else 0,
+            "good_guess_bad_guess_ratio": totals["good_guesses"] / totals["bad_guesses"] if totals["bad_guesses"] > 0 else totals["good_guesses"],
+            "avg_llm_calls_per_guess": totals["llm_calls"] / totals["good_guesses"] if totals["good_guesses"] > 0 else 0
+        })
 
     # Save to results dict
     if results_dict is not None:
-        results_dict["games"].append({
-            "run_id": run_id + 1,
-            "target_word": game.target_word,
-            "success": game.success,
-            "tries": game.num_of_tries(),
-            "average_game_completion": avg_game_completion,
-            "latency": game_latency,
-            "llm_calls": total_llm_calls,
-        })
-
-    return (total_tries, total_success, total_bad_guesses, total_good_guesses, 
-            total_latency, total_guess_latency, total_guess_count, total_llm_calls)
+        results_dict["games"].append({key: game[key] for key in (
+            "run_id", "target_word", "success", "tries", "average_game_completion",
+            "latency_ns", "llm_calls", "llm_cache_hits")})
 
 
 def test_games():
@@ -142,22 +169,15 @@ def test_games():
     print(f"# Model: {LLM_MODEL}")
     print(f"# Max retries: {MAX_LLM_CONTINUOUS_CALLS}")
     print(f"# Games: {NUM_RUNS}")
+    print(f"# Parallel games: {PARALLEL_GAMES}")
     print(f"{'#'*50}")
     
-    game = GameState(show_window=False, logging=True)
-
-    # Uncomment for Fibble mode:
-    # game.num_lies = 1
-    # game.num_guesses = 9
+    print(f"Loaded {load_llm_cache(LLM_CACHE_FILE)} cached LLM responses")
+    
+    warm_up_solver()
 
-    total_success = 0
-    total_tries = 0
-    total_bad_guesses = 0
-    total_good_guesses = 0
-    total_guess_count = 0
-    total_latency = 0.0
-    total_guess_latency = 0.0
-    total_llm_calls = 0
+    totals = dict.fromkeys(("tries", "success", "bad_guesses", "good_guesses", "latency_ns",
+                            "guess_latency_ns", "guess_count", "llm_calls", "llm_cache_hits"), 0)
 
     results = {
         "num_runs": NUM_RUNS,
@@ -165,38 +185,62 @@ def test_games():
         "MAX_LLM_CONTINUOUS_CALLS": MAX_LLM_CONTINUOUS_CALLS,
         "games": []
     }
+    wandb_rows = []
+
+    # Draw every target up front so a run can be replayed with SEED
+    targets = random.Random(SEED).sample(WORDS_TUPLE, NUM_RUNS)
+
+    # Games are independent and wait on the LLM, so several play at once in
+    # threads; they share the LLM cache and the request rate limiter, which
+    # replaces the fixed sleep between games. Results are recorded in run order.
+    wall_start_ns = time.perf_counter_ns()
+    with ThreadPoolExecutor(max_workers=PARALLEL_GAMES) as executor:
+        futures = [executor.submit(run_game, i, target) for i, target in enumerate(targets)]
+        for future in futures:
+            record_game(future.result(), totals, results, wandb_rows)
+    wall_time = (time.perf_counter_ns() - wall_start_ns) / 1e9
 
-    for i in range(NUM_RUNS):
-        (total_tries, total_success, total_bad_guesses, total_good_guesses, 
-         total_latency, total_guess_latency, total_guess_count, total_llm_calls) = run_game(
-            game, i, total_tries, total_success, total_bad_guesses, 
-            total_good_guesses, total_latency, total_guess_latency, 
-            total_guess_count, total_llm_calls, results)
-        
-        if i < NUM_RUNS - 1:
-            time.sleep(2.0)  # 2 second delay to avoid rate limiting
+    total_success = totals["success"]
+    total_good_guesses = totals["good_guesses"]
+    total_bad_guesses = totals["bad_guesses"]
+    total_llm_calls = totals["llm_calls"]
+    total_guess_count = totals["guess_count"]
+    total_guess_latency_ns = totals["guess_latency_ns"]
 
     # Calculate final stats
     win_rate = total_success / NUM_RUNS
-    avg_tries = total_tries / NUM_RUNS
-    avg_latency = total_latency / NUM_RUNS
+    avg_tries = totals["tries"] / NUM_RUNS
+    avg_latency = totals["latency_ns"] / NUM_RUNS / 1e9
     avg_llm_calls = total_llm_calls / total_good_guesses if total_good_guesses > 0 else 0
 
     # Save results
     results["total_bad_guesses"] = total_bad_guesses
     results["total_good_guesses"] = total_good_guesses
-    results["total_guess_latency"] = total_guess_latency
+    results["total_guess_latency"] = total_guess_latency_ns / 1e9
     results["total_guess_count"] = total_guess_count
     results["good_guess_bad_guess_ratio"] = (total_good_guesses / total_bad_guesses 
                                               if total_bad_guesses > 0 else float('inf'))
     results["win_rate"] = win_rate
     results["avg_tries"] = avg_tries
     results["avg_latency"] = avg_latency
+    results["wall_time"] = wall_time
     results["total_llm_calls"] = total_llm_calls
+    results["total_llm_cache_hits"] = totals["llm_cache_hits"]
     results["avg_llm_calls_per_guess"] = avg_llm_calls
 
-    with open(LOG_FILE, "w") as f:
-        json.dump(results, f, indent=2)
+    write_json(LOG_FILE, results)
+
+    # Single batched wandb log instead of one network call per game
+    if HAS_WANDB and wandb_rows:
+        columns = list(wandb_rows[0])
+        wandb.log({
+            "games_table": wandb.Table(columns=columns,
+                                       data=[[row[c] for c in columns] for row in wandb_rows]),
+            "win_rate": win_rate,
+            "avg_tries": avg_tries,
+            "avg_latency": avg_latency,
+            "avg_llm_calls_per_guess": avg_llm_calls,
+        })
 
     # Print final results
     print(f"\n{'='*50}")
@@ -207,7 +251,9 @@ def test_games():
     print(f"  Win Rate:        {win_rate:.1%} ({total_success}/{NUM_RUNS})")
     print(f"  Average Tries:   {avg_tries:.2f}")
     print(f"  Average Latency: {avg_latency:.2f}s")
+    print(f"  Wall Time:       {wall_time:.2f}s")
     print(f"  Total LLM Calls: {total_llm_calls}")
+    print(f"  LLM Cache Hits:  {totals['llm_cache_hits']}")
     print(f"  Avg LLM/Guess:   {avg_llm_calls:.2f}")
     print(f"  Good Guesses:    {total_good_guesses}")
     print(f"  Bad Guesses:     {total_bad_guesses}")
@@ -217,6 +263,8 @@ def test_games():
         print(f"  Good/Bad Ratio:  ∞ (perfect!)")
     print(f"{'='*50}")
     print(f"\nResults saved to: {LOG_FILE}")
+    
+    save_llm_cache(LLM_CACHE_FILE)
 
 
 if __name__ == "__main__":
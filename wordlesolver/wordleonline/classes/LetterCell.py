@@ -1,10 +1,10 @@
-from enum import Enum
+from enum import IntEnum
 
 
-class Feedback(Enum):
-    correct = "correct"
-    present = "present"
-    incorrect = "incorrect"
+class Feedback(IntEnum):
+    incorrect = 0
+    present = 1
+    correct = 2
 
 
 class LetterCell: